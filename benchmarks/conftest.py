@@ -0,0 +1,117 @@
+from pathlib import Path
+import tracemalloc
+import pytest
+from exfor_parserpy import read_exfor, to_exfor
+from exfor_parserpy.utils.convenience import count_points_in_datablock
+from exfor_parserpy.utils.synthetic import generate_exfor, write_synthetic_exfor
+
+
+TESTDATA_DIR = Path(__file__).parent.parent / "tests" / "testdata"
+
+# name: arguments of generate_exfor
+SYNTHETIC_DATASETS = {
+    "many_subentries": dict(num_entries=5, num_subents=100, num_cols=6, num_rows=50),
+    "wide_table": dict(num_entries=1, num_subents=2, num_cols=60, num_rows=2000),
+    "long_table": dict(num_entries=1, num_subents=1, num_cols=6, num_rows=100000),
+    "pointers": dict(
+        num_entries=20,
+        num_subents=10,
+        num_cols=12,
+        num_rows=200,
+        num_common=6,
+        bib_lines=20,
+        num_pointers=3,
+        num_multifields=2,
+        blank_fraction=0.1,
+    ),
+    # the number of entries is set by --bench-library-entries
+    "library": dict(num_subents=5, num_cols=8, num_rows=100, bib_lines=5),
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-datasets",
+        action="store",
+        default="testdata," + ",".join(SYNTHETIC_DATASETS),
+        help="comma-separated list of datasets to benchmark",
+    )
+    parser.addoption(
+        "--bench-diff-max-rows",
+        action="store",
+        type=int,
+        default=100000,
+        help="skip the diff of datasets with longer DATA tables",
+    )
+    parser.addoption(
+        "--bench-library-entries",
+        action="store",
+        type=int,
+        default=200,
+        help="number of entries in the library dataset",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "dataset" in metafunc.fixturenames:
+        names = metafunc.config.option.bench_datasets.split(",")
+        metafunc.parametrize("dataset", names, indirect=True)
+
+
+@pytest.fixture(scope="session")
+def dataset(request, tmp_path_factory):
+    """A file, its size, the number of entries and the parsed content."""
+    name = request.param
+    filename = tmp_path_factory.mktemp("bench") / f"{name}.txt"
+    if name == "testdata":
+        text = "\n".join(f.read_text() for f in sorted(TESTDATA_DIR.glob("*.txt")))
+        filename.write_text(text)
+    elif name == "library":
+        num_entries = request.config.option.bench_library_entries
+        write_synthetic_exfor(filename, num_entries, **SYNTHETIC_DATASETS[name])
+    else:
+        text = "\n".join(to_exfor(generate_exfor(**SYNTHETIC_DATASETS[name])))
+        filename.write_text(text)
+    exfor_dic = read_exfor(filename)
+    return {
+        "name": name,
+        "filename": filename,
+        "nbytes": filename.stat().st_size,
+        "nentries": len(exfor_dic),
+        "max_rows": get_max_rows(exfor_dic),
+        "exfor_dic": exfor_dic,
+    }
+
+
+def get_max_rows(exfor_dic):
+    max_rows = 0
+    for entry in exfor_dic.values():
+        for subent in entry.values():
+            if "DATA" in subent:
+                max_rows = max(max_rows, count_points_in_datablock(subent["DATA"]))
+    return max_rows
+
+
+@pytest.fixture
+def measure(benchmark):
+    """Benchmark a function and record throughput and peak memory."""
+
+    def run(fun, dataset, rounds=3):
+        result = benchmark.pedantic(fun, rounds=rounds, iterations=1)
+        stats = getattr(benchmark, "stats", None)
+        if stats is not None:
+            mean = stats.stats.mean
+            benchmark.extra_info["entries_per_sec"] = dataset["nentries"] / mean
+            benchmark.extra_info["mb_per_sec"] = dataset["nbytes"] / mean / 1e6
+        # tracing slows down the function so the
+        # memory is measured in a separate call
+        tracemalloc.start()
+        try:
+            fun()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory_mb"] = peak / 1e6
+        return result
+
+    return run
@@ -0,0 +1,27 @@
+from copy import deepcopy
+import pytest
+from exfor_parserpy import exfor_diff
+
+pytest.importorskip("pytest_benchmark")
+
+
+def modify_content(exfor_dic):
+    """Change every tenth number in the DATA sections."""
+    modified = deepcopy(exfor_dic)
+    for entry in modified.values():
+        for subent in entry.values():
+            if "DATA" not in subent:
+                continue
+            for key, column in subent["DATA"]["DATA"].items():
+                if isinstance(column, list):
+                    for i in range(0, len(column), 10):
+                        if column[i] is not None:
+                            column[i] *= 1.01
+    return modified
+
+
+def test_exfor_diff(measure, dataset, request):
+    if dataset["max_rows"] > request.config.option.bench_diff_max_rows:
+        pytest.skip("the DATA tables are too long for the diff")
+    modified = modify_content(dataset["exfor_dic"])
+    measure(lambda: exfor_diff(dataset["exfor_dic"], modified), dataset, rounds=1)
@@ -0,0 +1,26 @@
+import pytest
+from exfor_parserpy import read_exfor, to_exfor, write_exfor, iter_exfor
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_read_exfor(measure, dataset):
+    measure(lambda: read_exfor(dataset["filename"]), dataset)
+
+
+def test_read_exfor_numpy_backend(measure, dataset):
+    parse_opts = {"array_backend": "numpy"}
+    measure(lambda: read_exfor(dataset["filename"], parse_opts=parse_opts), dataset)
+
+
+def test_iter_exfor(measure, dataset):
+    measure(lambda: sum(1 for _ in iter_exfor(dataset["filename"])), dataset)
+
+
+def test_to_exfor(measure, dataset):
+    measure(lambda: to_exfor(dataset["exfor_dic"]), dataset)
+
+
+def test_write_exfor(measure, dataset, tmp_path):
+    outfile = tmp_path / "output.txt"
+    measure(lambda: write_exfor(outfile, dataset["exfor_dic"], overwrite=True), dataset)
@@ -0,0 +1,31 @@
+import pytest
+from exfor_parserpy.trafos import (
+    unitfy,
+    uncommonfy,
+    depointerfy,
+    detextify,
+    reactify,
+    tablify,
+    Pipeline,
+)
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize(
+    "trafo", [unitfy, uncommonfy, depointerfy, detextify, reactify]
+)
+def test_trafo(measure, dataset, trafo):
+    measure(lambda: trafo(dataset["exfor_dic"]), dataset)
+
+
+def test_pipeline(measure, dataset):
+    pipeline = Pipeline([uncommonfy, depointerfy, unitfy])
+    measure(lambda: pipeline(dataset["exfor_dic"]), dataset)
+
+
+def test_tablify(measure, dataset):
+    # the default mode of tablify fails for libraries
+    # whose entries lead to duplicate column names
+    prepared = Pipeline([uncommonfy, depointerfy, unitfy])(dataset["exfor_dic"])
+    measure(lambda: tablify(prepared, columnar=True), dataset)
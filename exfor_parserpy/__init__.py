@@ -1,2 +1,18 @@
-from .exfor_parser import from_exfor, to_exfor, read_exfor, write_exfor
+from .exfor_parser import (
+    from_exfor,
+    to_exfor,
+    read_exfor,
+    iter_exfor,
+    write_exfor,
+    ExforWriter,
+)
+from .exfor_file import ExforFile
+from .exfor_dir import read_exfor_dir, iter_exfor_dir
 from .exfor_diff import write_exfor_diff, exfor_diff
+from .exfor_patch import (
+    exfor_patch,
+    apply_exfor_patch,
+    write_exfor_patch,
+    read_exfor_patch,
+)
+from .exfor_library_diff import library_diff, fingerprint_library
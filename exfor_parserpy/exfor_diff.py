@@ -30,6 +30,8 @@ from .utils.convenience import (
     contains_pointers,
 )
 from .utils.custom_iterators import search_for_field
+from .utils.alignment import compute_row_edit_path, compute_text_edit_types
+from .utils.fingerprint import fingerprint_entry
 import numpy as np
 import html
 
@@ -83,15 +85,29 @@ def compute_edit_path(str1=None, str2=None, cmpfun=None):
     return np.array(p)
 
 
+def columns_to_rows(columns, numrows):
+    if len(columns) == 0:
+        return np.empty((numrows, 0), dtype=float)
+    return np.array(columns, dtype=float).T
+
+
 def postprocess_edit_type(edit_type, string):
     edit_type = edit_type.copy()
+    # all elements between j and i are insertions so the
+    # search for the preceding element other than an
+    # insertion can resume at j for the next insertion,
+    # and if there is none, there is none for all others
+    j = len(edit_type)
     for i in range(len(edit_type) - 1, 0, -1):
         if edit_type[i] != "i":
             continue
-        j = i - 1
+        if j >= i:
+            j = i - 1
         while j >= 0 and edit_type[j] == "i":
             j -= 1
-        if j >= 0 and string[i] == string[j]:
+        if j < 0:
+            break
+        if string[i] == string[j]:
             edit_type[i] = "k"
             edit_type[j] = "i"
     return edit_type
@@ -249,11 +265,8 @@ def bib_element_diff(datadic1, datadic2):
             lens2 = [len(s) for s in lc2]
             breaks1 = np.cumsum([0] + lens1)
             breaks2 = np.cumsum([0] + lens2)
-            lc1j = "".join(lc1)
             lc2j = "".join(lc2)
-            edit_path = compute_edit_path(lc1j, lc2j)
-            ep1 = edit_path[np.isin(edit_path, ("d", "k"))]
-            ep2 = edit_path[np.isin(edit_path, ("i", "k"))]
+            ep1, ep2 = compute_text_edit_types(lc1, lc2)
             ep2 = postprocess_edit_type(ep2, lc2j)
             ep1s = [ep1[i:j] for i, j in zip(breaks1[:-1], breaks1[1:])]
             ep2s = [ep2[i:j] for i, j in zip(breaks2[:-1], breaks2[1:])]
@@ -486,51 +499,16 @@ def common_or_data_diff(datadic1, datadic2, what="common"):
         curlines = align_side_by_side(curlines1, curlines2, escape=False)
         lines.extend(curlines)
     elif what == "data":
-        # get a column of the DATA section table
-        # to determine the numbe of rows
-        curdic1 = data_dic1
-        while isinstance(curdic1, dict):
-            for key, cont in curdic1.items():
-                curdic1 = cont
-                break
-        numlines1 = len(curdic1)
-        curdic2 = data_dic2
-        while isinstance(curdic2, dict):
-            for key, cont in curdic2.items():
-                curdic2 = cont
-                break
-        numlines2 = len(curdic2)
-        # cycle through the columns
-        values1 = []
-        for currow1 in range(numlines1):
-            values1.append([])
-            curvals1 = values1[currow1]
-            sorted_keys = sorted(unit_dic1.keys())
-            for fieldkey in sorted_keys:
-                cont = unit_dic1[fieldkey]
-                for pointer in cont:
-                    curvals1.append(data_dic1[fieldkey][pointer][currow1])
-        values2 = []
-        for currow2 in range(numlines2):
-            values2.append([])
-            curvals2 = values2[currow2]
-            sorted_keys = sorted(unit_dic2.keys())
-            for fieldkey in sorted_keys:
-                cont = unit_dic2[fieldkey]
-                for pointer in cont:
-                    curvals2.append(data_dic2[fieldkey][pointer][currow2])
-
-        values1_arr = [np.array(v, dtype=float) for v in values1]
-        values2_arr = [np.array(v, dtype=float) for v in values2]
-
-        def cmpfun(x, y):
-            cmpres = np.sum(x[~remove_mask] != y[~insert_mask])
-            cmpres *= 2 / cmpfun.numfields
-            return cmpres
-
-        cmpfun.numfields = np.sum(~remove_mask)
-
-        ep = compute_edit_path(values1_arr, values2_arr, cmpfun)
+        # the columns in the order of the header
+        columns1 = [data_dic1[fieldkey][pointer] for fieldkey, pointer in descrs1]
+        columns2 = [data_dic2[fieldkey][pointer] for fieldkey, pointer in descrs2]
+        values1 = list(zip(*columns1))
+        values2 = list(zip(*columns2))
+        values1_arr = columns_to_rows(columns1, len(values1))
+        values2_arr = columns_to_rows(columns2, len(values2))
+        ep = compute_row_edit_path(
+            values1_arr[:, ~remove_mask], values2_arr[:, ~insert_mask]
+        )
         ep1 = ep[ep != "i"]
         ep2 = ep[ep != "d"]
         numfields1 = len(remove_mask)
@@ -675,9 +653,7 @@ def entry_diff(datadic1, datadic2):
     return lines
 
 
-def output_diff(datadic1, datadic2):
-    header = [
-        """
+HTML_HEADER = """
     <!DOCTYPE html>
     <html> <head>
     <style>
@@ -687,40 +663,113 @@ def output_diff(datadic1, datadic2):
     .noline { background-color:#ffffe0; }
     </style></head><body>
     """
-    ]
-    lines = []
-    entryids = sorted(set(tuple(datadic1.keys()) + tuple(datadic2.keys())))
+
+HTML_FOOTER = "</body></html>"
+
+
+def output_entry_diff(entryid, datadic1, datadic2):
+    if entryid not in datadic2:
+        curdic1 = datadic1[entryid]
+        lines1, _ = output_entry(curdic1)
+        return align_side_by_side(lines1, None)
+    elif entryid not in datadic1:
+        curdic2 = datadic2[entryid]
+        lines2, _ = output_entry(curdic2)
+        return align_side_by_side(None, lines2)
+    else:
+        curdic1 = datadic1[entryid]
+        curdic2 = datadic2[entryid]
+        return entry_diff(curdic1, curdic2)
+
+
+def collapse_unchanged_lines(lines, context=3, min_collapse=4):
+    """Wrap runs of unchanged lines into expandable blocks.
+
+    Lines without diff markers that are more than context lines
+    away from a changed line are put into a details element if
+    there are at least min_collapse of them in a row.
+    """
+    changed = np.array(["<mark" in line for line in lines], dtype=bool)
+    # a line is shown if a changed line is within context lines
+    shown = changed.copy()
+    for shift in range(1, context + 1):
+        shown[shift:] |= changed[:-shift]
+        shown[:-shift] |= changed[shift:]
+    newlines = []
+    i = 0
+    while i < len(lines):
+        j = i
+        while j < len(lines) and not shown[j]:
+            j += 1
+        if j - i >= min_collapse:
+            newlines.append(f"<details><summary>{j - i} unchanged lines</summary>")
+            newlines.extend(line + "<br>" for line in lines[i:j])
+            newlines.append("</details>")
+        else:
+            newlines.extend(line + "<br>" for line in lines[i:j])
+        if j < len(lines):
+            newlines.append(lines[j] + "<br>")
+        i = j + 1
+    return newlines
+
+
+def iter_diff_lines(datadic1, datadic2, context=None):
+    """Yield the lines of the HTML diff entry by entry.
+
+    If context is given, entries with the same content are
+    only mentioned and runs of unchanged lines farther than
+    context lines away from a change are collapsed.
+    """
+    yield HTML_HEADER
+    entryids = sorted(set(datadic1.keys()).union(datadic2.keys()))
     for entryid in entryids:
-        if entryid not in datadic2:
-            curdic1 = datadic1[entryid]
-            lines1, _ = output_entry(curdic1)
-            curlines = align_side_by_side(lines1, None)
-        elif entryid not in datadic1:
-            curdic2 = datadic2[entryid]
-            lines2, _ = output_entry(curdic2)
-            curlines = align_side_by_side(None, lines2)
+        if context is None:
+            curlines = output_entry_diff(entryid, datadic1, datadic2)
+            yield from (li + "<br>" for li in curlines)
+        elif (
+            entryid in datadic1
+            and entryid in datadic2
+            and fingerprint_entry(datadic1[entryid])
+            == fingerprint_entry(datadic2[entryid])
+        ):
+            yield f"ENTRY {html.escape(entryid)} unchanged<br>"
         else:
-            curdic1 = datadic1[entryid]
-            curdic2 = datadic2[entryid]
-            curlines = entry_diff(curdic1, curdic2)
-        lines.extend(curlines)
-    lines = [li + "<br>" for li in lines]
-    lines.append("</body></html>")
-    return header + lines
+            curlines = output_entry_diff(entryid, datadic1, datadic2)
+            yield from collapse_unchanged_lines(curlines, context)
+    yield HTML_FOOTER
+
+
+def output_diff(datadic1, datadic2, context=None):
+    return list(iter_diff_lines(datadic1, datadic2, context))
 
 
 # the user interface
-def exfor_diff(exfor_dic1, exfor_dic2):
-    lines = output_diff(datadic1=exfor_dic1, datadic2=exfor_dic2)
+def exfor_diff(exfor_dic1, exfor_dic2, context=None):
+    lines = output_diff(datadic1=exfor_dic1, datadic2=exfor_dic2, context=context)
     return lines
 
 
-def write_exfor_diff(filename, exfor_dic1, exfor_dic2, overwrite=False):
+def write_diff_lines(filename, lines):
+    # the lines are written as they come in
+    with open(filename, "w") as f:
+        for i, line in enumerate(lines):
+            if i > 0:
+                f.write("\n")
+            f.write(line)
+
+
+def write_exfor_diff(filename, exfor_dic1, exfor_dic2, overwrite=False, context=3):
+    """Write the HTML diff of two EXFOR dictionaries to a file.
+
+    The diff is written entry by entry. Entries with the same
+    content are only mentioned and runs of unchanged lines are
+    collapsed unless context is None. For large libraries,
+    library_diff writes a separate page for each entry instead.
+    """
     if not overwrite and exists(filename):
         raise FileExistsError(f"The file {filename} already exists")
-    lines = exfor_diff(exfor_dic1, exfor_dic2)
-    with open(filename, "w") as f:
-        f.write("\n".join(lines))
+    lines = iter_diff_lines(exfor_dic1, exfor_dic2, context)
+    write_diff_lines(filename, lines)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from functools import partial
+from os.path import getsize
+from pathlib import Path
+import time
+import warnings
+from .exfor_parser import iter_exfor
+from .utils.parallel import ordered_parallel_map
+
+
+def read_exfor_dir(
+    path, pattern="*.txt", parse_opts=None, workers=None, errors=None, progress=None
+):
+    """Parse all EXFOR files matching a pattern in a directory.
+
+    See iter_exfor_dir for the meaning of the arguments.
+    """
+    exfor_dic = {}
+    entries = iter_exfor_dir(path, pattern, parse_opts, workers, errors, progress)
+    for entryid, entry in entries:
+        exfor_dic[entryid] = entry
+    return exfor_dic
+
+
+def iter_exfor_dir(
+    path, pattern="*.txt", parse_opts=None, workers=None, errors=None, progress=None
+):
+    """Yield (entryid, entry) tuples of all EXFOR files in a directory.
+
+    The files matching the glob pattern, e.g., "**/*.txt" to
+    include subdirectories, are parsed in sorted order and, if
+    workers is given, in a pool of worker processes. A file that
+    cannot be parsed does not abort the loop but is appended as
+    (filename, message) tuple to the errors list or, if no list
+    is provided, reported as warning. The progress function is
+    called after each file with a dictionary of statistics.
+    """
+    filenames = sorted(p for p in Path(path).glob(pattern) if p.is_file())
+    parse_fun = partial(parse_file, parse_opts=parse_opts)
+    if workers is not None and workers > 1:
+        results = ordered_parallel_map(parse_fun, filenames, workers)
+    else:
+        results = map(parse_fun, filenames)
+    stats = init_progress_stats(len(filenames))
+    start = time.perf_counter()
+    for filename, entries, message in results:
+        if message is not None:
+            stats["errors"] += 1
+            if errors is None:
+                warnings.warn(f"failed to parse {filename}: {message}")
+            else:
+                errors.append((filename, message))
+            entries = []
+        update_progress_stats(stats, start, filename, len(entries))
+        if progress is not None:
+            progress(stats)
+        yield from entries
+
+
+def parse_file(filename, parse_opts=None):
+    # exceptions are returned as messages because they
+    # may not survive the transfer from a worker process
+    try:
+        entries = list(iter_exfor(filename, parse_opts=parse_opts))
+    except Exception as exc:
+        return filename, None, f"{type(exc).__name__}: {exc}"
+    return filename, entries, None
+
+
+def init_progress_stats(num_files):
+    return {
+        "files_done": 0,
+        "files_total": num_files,
+        "entries": 0,
+        "errors": 0,
+        "bytes": 0,
+        "elapsed": 0.0,
+        "files_per_sec": 0.0,
+        "entries_per_sec": 0.0,
+        "mb_per_sec": 0.0,
+    }
+
+
+def update_progress_stats(stats, start, filename, num_entries):
+    stats["files_done"] += 1
+    stats["entries"] += num_entries
+    stats["bytes"] += getsize(filename)
+    elapsed = time.perf_counter() - start
+    stats["elapsed"] = elapsed
+    if elapsed > 0:
+        stats["files_per_sec"] = stats["files_done"] / elapsed
+        stats["entries_per_sec"] = stats["entries"] / elapsed
+        stats["mb_per_sec"] = stats["bytes"] / elapsed / 1e6
@@ -0,0 +1,119 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from .exfor_parser import parse_entry, parse_subentry
+from .utils.compression import is_compressed
+from .utils.file_index import (
+    load_index,
+    locate_sections,
+    open_mmap,
+    read_block_lines,
+)
+
+
+class ExforFile:
+    """Random access to the entries of an EXFOR file.
+
+    A side-car index with the byte offsets of all ENTRY and
+    SUBENT blocks is created on first use (or loaded if it
+    is still valid) so that individual entries and subentries
+    can be parsed without reading the complete file.
+    The file is memory-mapped and only the bytes of the
+    requested blocks, or even only of the requested sections
+    of a subentry, are decoded.
+    """
+
+    def __init__(self, filename, parse_opts=None, index_filename=None, persist=True):
+        if is_compressed(filename):
+            raise ValueError(
+                f"{filename} is compressed and does not allow random access, "
+                + "use read_exfor or iter_exfor instead"
+            )
+        self.filename = filename
+        self.parse_opts = parse_opts
+        self.index = load_index(filename, index_filename, persist=persist)
+        self._file = open(filename, "rb")
+        self._buf = open_mmap(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if hasattr(self._buf, "close"):
+            self._buf.close()
+        self._file.close()
+
+    def __len__(self):
+        return len(self.index["entries"])
+
+    def __iter__(self):
+        return iter(self.index["entries"])
+
+    def __contains__(self, entryid):
+        return entryid in self.index["entries"]
+
+    def __getitem__(self, entryid):
+        lines = self.read_entry_lines(entryid)
+        entry, _ = parse_entry(lines, parse_opts=self.parse_opts)
+        return entry
+
+    def read_entry_lines(self, entryid):
+        """Return the lines of an entry without parsing them."""
+        if entryid not in self.index["entries"]:
+            raise KeyError(f"entry {entryid} not found in {self.filename}")
+        offset, length = self.index["entries"][entryid]
+        return read_block_lines(self._buf, offset, length)
+
+    def keys(self):
+        return self.index["entries"].keys()
+
+    def subentry_keys(self):
+        return self.index["subentries"].keys()
+
+    def get(self, entryid, default=None):
+        if entryid not in self.index["entries"]:
+            return default
+        return self[entryid]
+
+    def items(self):
+        for entryid in self.index["entries"]:
+            yield entryid, self[entryid]
+
+    def get_subentry(self, subentid, default=None, sections=None):
+        """Parse a subentry, optionally restricted to some sections.
+
+        With sections, e.g., ("BIB",), only the SUBENT record
+        and the lines of the given sections are decoded.
+        """
+        if subentid not in self.index["subentries"]:
+            return default
+        entryid, offset, length = self.index["subentries"][subentid]
+        if sections is None:
+            lines = read_block_lines(self._buf, offset, length)
+        else:
+            lines = self._read_sections(offset, length, sections)
+        auxinfo = {"entryid": entryid}
+        subent, _ = parse_subentry(lines, auxinfo=auxinfo, parse_opts=self.parse_opts)
+        return subent
+
+    def _read_sections(self, offset, length, sections):
+        # the SUBENT record is needed to identify the subentry
+        lineend = self._buf.find(b"\n", offset, offset + length)
+        linelen = length if lineend == -1 else lineend + 1 - offset
+        lines = read_block_lines(self._buf, offset, linelen)
+        located = locate_sections(self._buf, offset, offset + length)
+        for section in ("BIB", "COMMON", "DATA"):
+            if section in sections and section in located:
+                start, end = located[section]
+                lines.extend(read_block_lines(self._buf, start, end - start))
+        return lines
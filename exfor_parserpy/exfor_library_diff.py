@@ -0,0 +1,273 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+import html
+import json
+import os
+import sys
+from functools import partial
+from .exfor_diff import iter_diff_lines, write_diff_lines
+from .exfor_file import ExforFile
+from .exfor_parser import parse_entry, read_exfor
+from .utils.compression import is_compressed
+from .utils.fingerprint import fingerprint_entry
+from .utils.parallel import ordered_parallel_map
+
+
+def fingerprint_library(exfor_dic):
+    """Return the content hashes of all subentries of all entries.
+
+    The result can be stored as JSON and passed to library_diff
+    so that the entries of a release only need to be read
+    if they have changed.
+    """
+    return {entryid: fingerprint_entry(entry) for entryid, entry in exfor_dic.items()}
+
+
+def compare_fingerprints(fingerprints1, fingerprints2):
+    """Determine added, removed and modified subentries of an entry."""
+    return {
+        "added": sorted(set(fingerprints2).difference(fingerprints1)),
+        "removed": sorted(set(fingerprints1).difference(fingerprints2)),
+        "modified": sorted(
+            k
+            for k in set(fingerprints1).intersection(fingerprints2)
+            if fingerprints1[k] != fingerprints2[k]
+        ),
+    }
+
+
+def library_diff(
+    exfor_dic1,
+    exfor_dic2,
+    outdir=None,
+    workers=None,
+    fingerprints1=None,
+    fingerprints2=None,
+    overwrite=False,
+    context=3,
+):
+    """Compare two releases of an EXFOR library.
+
+    The releases are given as dictionaries or as ExforFile
+    objects, which parse entries only when accessed. Entries
+    and subentries are compared by their content hashes, see
+    fingerprint_library, and precomputed hashes of one or
+    both releases can be passed as fingerprints1 and
+    fingerprints2. A summary with the added, removed and
+    modified entries and subentries is returned. If outdir is
+    given, the summary is written to summary.json together
+    with an index.html linking to a diff page for each entry
+    that differs. If workers is given, the missing hashes and
+    the pages are computed in a pool of worker processes,
+    which also parse the entries of ExforFile objects.
+    Unchanged lines farther than context lines away from a
+    change are collapsed on the pages, see write_exfor_diff.
+    With overwrite=True, the files of a previous diff in
+    outdir are removed first.
+    """
+    if outdir is not None:
+        if os.path.exists(os.path.join(outdir, "summary.json")):
+            if not overwrite:
+                raise FileExistsError(f"The directory {outdir} already contains a diff")
+            remove_library_diff(outdir)
+        os.makedirs(outdir, exist_ok=True)
+    fingerprints1, fingerprints2 = complete_fingerprints(
+        exfor_dic1, exfor_dic2, fingerprints1, fingerprints2, workers
+    )
+    summary = init_library_diff_summary()
+    tasks = iter_changed_entries(
+        exfor_dic1, exfor_dic2, fingerprints1, fingerprints2, summary, outdir
+    )
+    if outdir is None:
+        for _ in tasks:
+            pass
+        return summary
+    write_page = partial(write_entry_diff_page, context=context)
+    if workers is not None and workers > 1:
+        pages = ordered_parallel_map(write_page, tasks, workers)
+    else:
+        pages = map(write_page, tasks)
+    for entryid, filename in pages:
+        summary["pages"][entryid] = os.path.basename(filename)
+    with open(os.path.join(outdir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    with open(os.path.join(outdir, "index.html"), "w") as f:
+        f.write("\n".join(output_library_diff_index(summary)))
+    return summary
+
+
+def remove_library_diff(outdir):
+    # only the files written by library_diff are removed
+    with open(os.path.join(outdir, "summary.json"), "r") as f:
+        summary = json.load(f)
+    filenames = list(summary.get("pages", {}).values())
+    filenames += ["index.html", "summary.json"]
+    for filename in filenames:
+        filepath = os.path.join(outdir, os.path.basename(filename))
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+def complete_fingerprints(
+    exfor_dic1, exfor_dic2, fingerprints1, fingerprints2, workers
+):
+    """Compute the hashes of the entries present in both releases."""
+    entryids = sorted(set(exfor_dic1.keys()).intersection(exfor_dic2.keys()))
+    tasks = []
+    for side, (exfor_dic, fingerprints) in enumerate(
+        ((exfor_dic1, fingerprints1), (exfor_dic2, fingerprints2))
+    ):
+        fingerprints = {} if fingerprints is None else fingerprints
+        tasks.extend(
+            (side, entryid, exfor_dic)
+            for entryid in entryids
+            if entryid not in fingerprints
+        )
+    result = [
+        dict(fingerprints1) if fingerprints1 is not None else {},
+        dict(fingerprints2) if fingerprints2 is not None else {},
+    ]
+    sources = (
+        (side, entryid, get_entry_source(exfor_dic, entryid))
+        for side, entryid, exfor_dic in tasks
+    )
+    if workers is not None and workers > 1:
+        fingerprinted = ordered_parallel_map(fingerprint_entry_source, sources, workers)
+    else:
+        fingerprinted = map(fingerprint_entry_source, sources)
+    for side, entryid, fingerprint in fingerprinted:
+        result[side][entryid] = fingerprint
+    return result
+
+
+def get_entry_source(exfor_dic, entryid):
+    # the entries of an ExforFile are passed as lines
+    # so that they are parsed in the worker processes
+    if isinstance(exfor_dic, ExforFile):
+        return ("lines", exfor_dic.read_entry_lines(entryid), exfor_dic.parse_opts)
+    return ("entry", exfor_dic[entryid], None)
+
+
+def load_entry_source(source):
+    kind, content, parse_opts = source
+    if kind == "lines":
+        entry, _ = parse_entry(content, parse_opts=parse_opts)
+        return entry
+    return content
+
+
+def fingerprint_entry_source(task):
+    side, entryid, source = task
+    return side, entryid, fingerprint_entry(load_entry_source(source))
+
+
+def init_library_diff_summary():
+    summary = {}
+    for level in ("entries", "subentries"):
+        summary[level] = {"added": [], "removed": [], "modified": []}
+    summary["unchanged_entries"] = 0
+    summary["pages"] = {}
+    return summary
+
+
+def iter_changed_entries(
+    exfor_dic1, exfor_dic2, fingerprints1, fingerprints2, summary, outdir=None
+):
+    # yields the tasks for write_entry_diff_page and
+    # updates the summary along the way, the hashes
+    # of the entries in both releases must be given
+    entryids = sorted(set(exfor_dic1.keys()).union(exfor_dic2.keys()))
+    for entryid in entryids:
+        source1 = None
+        source2 = None
+        if entryid not in exfor_dic1:
+            summary["entries"]["added"].append(entryid)
+            entry2 = exfor_dic2[entryid]
+            summary["subentries"]["added"].extend(sorted(entry2))
+            source2 = ("entry", entry2, None)
+        elif entryid not in exfor_dic2:
+            summary["entries"]["removed"].append(entryid)
+            entry1 = exfor_dic1[entryid]
+            summary["subentries"]["removed"].extend(sorted(entry1))
+            source1 = ("entry", entry1, None)
+        else:
+            fp1 = fingerprints1[entryid]
+            fp2 = fingerprints2[entryid]
+            if fp1 == fp2:
+                summary["unchanged_entries"] += 1
+                continue
+            summary["entries"]["modified"].append(entryid)
+            for status, subentids in compare_fingerprints(fp1, fp2).items():
+                summary["subentries"][status].extend(subentids)
+            if outdir is not None:
+                source1 = get_entry_source(exfor_dic1, entryid)
+                source2 = get_entry_source(exfor_dic2, entryid)
+        if outdir is not None:
+            filename = os.path.join(outdir, f"{entryid}.html")
+            yield entryid, source1, source2, filename
+
+
+def write_entry_diff_page(task, context=3):
+    entryid, source1, source2, filename = task
+    datadic1 = {entryid: load_entry_source(source1)} if source1 is not None else {}
+    datadic2 = {entryid: load_entry_source(source2)} if source2 is not None else {}
+    write_diff_lines(filename, iter_diff_lines(datadic1, datadic2, context))
+    return entryid, filename
+
+
+def output_library_diff_index(summary):
+    lines = [
+        "<!DOCTYPE html>",
+        "<html><head><style>",
+        "body { font-family: 'Courier New', monospace; }",
+        ".added { background-color:#c0ffc8; }",
+        ".removed { background-color:#ffa07a; }",
+        "</style></head><body>",
+    ]
+    entries = summary["entries"]
+    subentries = summary["subentries"]
+    lines.append(
+        f"<p>{len(entries['added'])} entries added, "
+        + f"{len(entries['removed'])} removed, "
+        + f"{len(entries['modified'])} modified, "
+        + f"{summary['unchanged_entries']} unchanged<br>"
+        + f"{len(subentries['added'])} subentries added, "
+        + f"{len(subentries['removed'])} removed, "
+        + f"{len(subentries['modified'])} modified</p>"
+    )
+    for status in ("added", "removed", "modified"):
+        lines.append(f"<h2>{status.capitalize()} entries</h2>")
+        lines.append("<ul>")
+        for entryid in entries[status]:
+            name = html.escape(entryid)
+            page = summary["pages"].get(entryid)
+            if page is not None:
+                name = f'<a href="{html.escape(page)}">{name}</a>'
+            lines.append(f'<li class="{status}">{name}</li>')
+        lines.append("</ul>")
+    lines.append("</body></html>")
+    return lines
+
+
+def open_release(filename):
+    # compressed files do not allow random access
+    if is_compressed(filename):
+        return read_exfor(filename)
+    return ExforFile(filename)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        raise TypeError("expecting two filenames with EXFOR entries and a directory")
+    release1 = open_release(sys.argv[1])
+    release2 = open_release(sys.argv[2])
+    summary = library_diff(release1, release2, sys.argv[3], workers=os.cpu_count())
+    print(json.dumps({k: len(v) for k, v in summary["entries"].items()}))
@@ -7,7 +7,14 @@
 # License:      MIT
 #
 ############################################################
+import gzip
+import os
+from collections import Counter
 from os.path import exists
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from uuid import uuid4
+import numpy as np
 from .exfor_primitives import (
     read_str_field,
     write_str_field,
@@ -15,7 +22,10 @@ from .exfor_primitives import (
     read_int_field,
     write_int_field,
     read_fields,
+    read_float_columns,
     write_fields,
+    write_field_lines,
+    format_float_fields,
     update_dic,
     write_bib_element,
 )
@@ -27,8 +37,14 @@ from .utils.convenience import (
     init_duplicate_field_counters,
     reset_duplicate_field_counters,
     extend_pointer_for_multifield,
+    get_parse_opt,
+    is_dic,
 )
 from .utils.custom_iterators import search_for_field
+from .utils.file_index import load_index, open_mmap, read_block_lines
+from .utils.cache_utils import load_cached, store_cached
+from .utils.compression import is_compressed, iter_text_streams
+from .utils.profiling import profile_stage, count_bytes
 
 
 def parse_bib_element(lines, ofs=0, parse_opts=None):
@@ -110,13 +126,24 @@ def parse_common_or_data(lines, ofs=0, what="common", parse_opts=None):
     for k in unit_dic:
         unit_dic[k] = flatten_default_pointer(unit_dic[k])
 
+    use_arrays = get_parse_opt(parse_opts, "array_backend") == "numpy"
     value_dic = {}
-    for currow in range(numlines):
+    if what == "data" and numlines > 0:
+        columns, ofs = read_float_columns(
+            lines, numfields, numlines, ofs, as_arrays=use_arrays
+        )
+        reset_duplicate_field_counters(counter_dic)
+        for i, (curdescr, pointer) in enumerate(descrs):
+            pointer = extend_pointer_for_multifield(curdescr, pointer, counter_dic)
+            update_dic(value_dic, curdescr, pointer, columns[i], arr=False)
+    elif what == "common":
         values, ofs = read_fields(lines, numfields, ofs, dtype="float")
+        if use_arrays:
+            values = [v if v is not None else np.nan for v in values]
         reset_duplicate_field_counters(counter_dic)
         for i, (curdescr, pointer) in enumerate(descrs):
             pointer = extend_pointer_for_multifield(curdescr, pointer, counter_dic)
-            update_dic(value_dic, curdescr, pointer, values[i], arr=(what == "data"))
+            update_dic(value_dic, curdescr, pointer, values[i], arr=False)
     for k in value_dic:
         value_dic[k] = flatten_default_pointer(value_dic[k])
 
@@ -126,63 +153,54 @@ def parse_common_or_data(lines, ofs=0, what="common", parse_opts=None):
 
 def output_common_or_data(datadic, ofs=0, what="common"):
     lines = []
-    numfields = count_fields(datadic["DATA"])
-    numlines = 1 if what == "common" else count_points_in_datablock(datadic)
-    headline = write_str_field("", 0, "COMMON" if what == "common" else "DATA")
-    headline = write_int_field(headline, 1, numfields)
-    headline = write_int_field(headline, 2, numlines)
-    lines.append(headline)
-    ofs += 1
     # prepare descrs, unit and value lists
     descrs = []
     units = []
+    columns = []
     for fieldkey, cont in datadic["UNIT"].items():
         if contains_pointers(cont):
             for pointer in cont:
                 descrs.append((fieldkey, pointer))
                 units.append(datadic["UNIT"][fieldkey][pointer])
+                columns.append(datadic["DATA"][fieldkey][pointer])
         else:
             descrs.append((fieldkey, None))
             units.append(datadic["UNIT"][fieldkey])
+            columns.append(datadic["DATA"][fieldkey])
+    if what == "common":
+        columns = [[value] for value in columns]
+    # the rows are assembled from the columns,
+    # which must therefore all have the length of the majority
+    lengths = [len(column) for column in columns]
+    fieldnames = [f if p is None else f"{f} {p}" for f, p in descrs]
+    if len(set(lengths)) > 1:
+        numrows = Counter(lengths).most_common(1)[0][0]
+        refname = fieldnames[lengths.index(numrows)]
+        for fieldname, length in zip(fieldnames, lengths):
+            if length != numrows:
+                raise ValueError(
+                    f"the column {fieldname} has {length} values "
+                    + f"but the column {refname} has {numrows}"
+                )
+    numfields = count_fields(datadic["DATA"])
+    numlines = 1 if what == "common" else count_points_in_datablock(datadic)
+    headline = write_str_field("", 0, "COMMON" if what == "common" else "DATA")
+    headline = write_int_field(headline, 1, numfields)
+    headline = write_int_field(headline, 2, numlines)
+    lines.append(headline)
+    ofs += 1
     # write out the header
     curlines = write_fields(descrs, ofs, dtype="strp")
     lines.extend(curlines)
     curlines = write_fields(units, ofs, dtype="str")
 
     lines.extend(curlines)
-    # write the data
-    if what == "common":
-        values = []
-        for fieldkey, cont in datadic["UNIT"].items():
-            if contains_pointers(cont):
-                for pointer in cont:
-                    values.append(datadic["DATA"][fieldkey][pointer])
-            else:
-                values.append(datadic["DATA"][fieldkey])
-        curlines = write_fields(values, ofs, dtype="float")
+    # write the data with the numbers formatted column by column
+    columns = [format_float_fields(column) for column in columns]
+    for row in zip(*columns):
+        curlines = write_field_lines(row)
         lines.extend(curlines)
         ofs += len(curlines)
-    elif what == "data":
-        curdic = datadic["DATA"]
-        # get a column of the DATA section table
-        # to determine the numbe of rows
-        while isinstance(curdic, dict):
-            for key, cont in curdic.items():
-                curdic = cont
-                break
-        numlines = len(curdic)
-        # cycle through the columns
-        for currow in range(numlines):
-            values = []
-            for fieldkey, cont in datadic["UNIT"].items():
-                if contains_pointers(cont):
-                    for pointer in cont:
-                        values.append(datadic["DATA"][fieldkey][pointer][currow])
-                else:
-                    values.append(datadic["DATA"][fieldkey][currow])
-            curlines = write_fields(values, ofs, dtype="float")
-            lines.extend(curlines)
-            ofs += len(curlines)
     lines.append(write_str_field("", 0, "ENDCOMMON" if what == "common" else "ENDDATA"))
     ofs += 1
     return lines, ofs
@@ -200,20 +218,27 @@ def parse_subentry(lines, ofs=0, auxinfo=None, parse_opts=None):
     ofs += 1
     while ofs < len(lines) and read_str_field(lines[ofs], 0) != "ENDSUBENT":
         curfield = read_str_field(lines[ofs], 0)
+        start = ofs
         if curfield == "BIB":
-            bibsec, ofs = parse_bib(lines, ofs)
+            with profile_stage("parse_bib", parse_opts=parse_opts) as stage:
+                bibsec, ofs = parse_bib(lines, ofs)
+                stage.count(lines=ofs - start)
             datadic["BIB"] = bibsec
 
         if curfield == "COMMON":
-            commonsec, ofs = parse_common_or_data(
-                lines, ofs, what="common", parse_opts=parse_opts
-            )
+            with profile_stage("parse_common", parse_opts=parse_opts) as stage:
+                commonsec, ofs = parse_common_or_data(
+                    lines, ofs, what="common", parse_opts=parse_opts
+                )
+                stage.count(lines=ofs - start)
             datadic["COMMON"] = commonsec
 
         if curfield == "DATA":
-            datasec, ofs = parse_common_or_data(
-                lines, ofs, what="data", parse_opts=parse_opts
-            )
+            with profile_stage("parse_data", parse_opts=parse_opts) as stage:
+                datasec, ofs = parse_common_or_data(
+                    lines, ofs, what="data", parse_opts=parse_opts
+                )
+                stage.count(lines=ofs - start)
             datadic["DATA"] = datasec
         else:
             ofs += 1
@@ -254,19 +279,25 @@ def parse_entry(lines, ofs=0, auxinfo=None, parse_opts=None):
     if auxinfo is None:
         auxinfo = {}
     auxinfo["entryid"] = read_str_field(lines[ofs], 1).strip()
-    ofs += 1
-    datadic = {}
-    while ofs < len(lines) and read_str_field(lines[ofs], 0) != "ENDENTRY":
-        if read_str_field(lines[ofs], 0) == "SUBENT":
-            subentid = read_str_field(lines[ofs], 1).strip()
-            subent, ofs = parse_subentry(
-                lines, ofs, auxinfo=auxinfo, parse_opts=parse_opts
-            )
-            datadic[subentid] = subent
-        else:
-            ofs += 1
-    # advance ofs after ENDENTRY line
-    ofs += 1
+    stage = profile_stage("parse_entry", auxinfo["entryid"], parse_opts)
+    with stage:
+        start = ofs
+        ofs += 1
+        datadic = {}
+        while ofs < len(lines) and read_str_field(lines[ofs], 0) != "ENDENTRY":
+            if read_str_field(lines[ofs], 0) == "SUBENT":
+                subentid = read_str_field(lines[ofs], 1).strip()
+                subent, ofs = parse_subentry(
+                    lines, ofs, auxinfo=auxinfo, parse_opts=parse_opts
+                )
+                datadic[subentid] = subent
+            else:
+                ofs += 1
+        # advance ofs after ENDENTRY line
+        ofs += 1
+        if stage.active:
+            curlines = lines[start:ofs]
+            stage.count(len(curlines), count_bytes(curlines), entries=1)
     return datadic, ofs
 
 
@@ -303,6 +334,53 @@ def parse(lines, ofs=0, parse_opts=None):
     return datadic, ofs
 
 
+def iter_entry_blocks(lines):
+    """Group lines into blocks from ENTRY to ENDENTRY."""
+    block = None
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        curfield = read_str_field(line, 0)
+        if curfield == "ENTRY":
+            block = [line]
+        elif block is not None:
+            block.append(line)
+            if curfield == "ENDENTRY":
+                yield block
+                block = None
+    # an unterminated entry at the end is passed on
+    # as parse_entry also accepts it
+    if block is not None:
+        yield block
+
+
+def parse_entry_block(lines, parse_opts=None):
+    entryid = read_str_field(lines[0], 1).strip()
+    entry, _ = parse_entry(lines, parse_opts=parse_opts)
+    return entryid, entry
+
+
+def parse_in_parallel(lines, workers, parse_opts=None):
+    """Parse the entries in a pool of worker processes."""
+    blocks = list(iter_entry_blocks(lines))
+    chunksize = max(1, len(blocks) // (4 * workers))
+    datadic = {}
+    stage = profile_stage("parse_parallel", parse_opts=parse_opts)
+    # a profiler would only record the work of the
+    # workers in its copies sent to the workers
+    if parse_opts is not None and "profile" in parse_opts:
+        parse_opts = {k: v for k, v in parse_opts.items() if k != "profile"}
+    with stage, ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            parse_entry_block, blocks, repeat(parse_opts), chunksize=chunksize
+        )
+        # map preserves the order of the blocks
+        for entryid, entry in results:
+            datadic[entryid] = entry
+        if stage.active:
+            stage.count(len(lines), count_bytes(lines), len(datadic))
+    return datadic
+
+
 def output(datadic, ofs=0):
     lines = []
     for curentryid, curdic in datadic.items():
@@ -312,7 +390,7 @@ def output(datadic, ofs=0):
 
 
 # the user interface
-def from_exfor(cont, parse_opts=None):
+def from_exfor(cont, parse_opts=None, workers=None):
     if isinstance(cont, str):
         lines = cont.splitlines()
     elif isinstance(cont, list):
@@ -322,6 +400,8 @@ def from_exfor(cont, parse_opts=None):
             "argument must be either string with "
             + "EXFOR entry or list of lines with EXFOR entry"
         )
+    if workers is not None and workers > 1:
+        return parse_in_parallel(lines, workers, parse_opts=parse_opts)
     exfor_dic, _ = parse(lines=lines, parse_opts=parse_opts)
     return exfor_dic
 
@@ -331,16 +411,141 @@ def to_exfor(exfor_dic):
     return lines
 
 
-def read_exfor(filename, parse_opts=None):
-    with open(filename, "r") as f:
-        cont = f.readlines()
-    cont = [line.rstrip("\n").rstrip("\r") for line in cont]
-    return from_exfor(cont, parse_opts=parse_opts)
+def read_exfor(filename, parse_opts=None, entries=None, workers=None, cache_dir=None):
+    if entries is not None:
+        return read_exfor_entries(filename, entries, parse_opts=parse_opts)
+    if cache_dir is not None:
+        exfor_dic = load_cached(filename, cache_dir, parse_opts)
+        if exfor_dic is not None:
+            return exfor_dic
+    # compressed files and archives are decompressed on the fly
+    cont = []
+    for _, f in iter_text_streams(filename):
+        cont.extend(line.rstrip("\n").rstrip("\r") for line in f)
+    exfor_dic = from_exfor(cont, parse_opts=parse_opts, workers=workers)
+    if cache_dir is not None:
+        store_cached(filename, cache_dir, exfor_dic, parse_opts)
+    return exfor_dic
+
+
+def read_exfor_entries(filename, entryids, parse_opts=None, index=None):
+    """Parse selected entries by seeking to their position in the file."""
+    if index is None and is_compressed(filename):
+        return scan_exfor_entries(filename, entryids, parse_opts=parse_opts)
+    if index is None:
+        index = load_index(filename)
+    exfor_dic = {}
+    with open(filename, "rb") as f:
+        buf = open_mmap(f)
+        try:
+            for entryid in entryids:
+                if entryid not in index["entries"]:
+                    raise KeyError(f"entry {entryid} not found in {filename}")
+                offset, length = index["entries"][entryid]
+                lines = read_block_lines(buf, offset, length)
+                exfor_dic[entryid], _ = parse_entry(lines, parse_opts=parse_opts)
+        finally:
+            if hasattr(buf, "close"):
+                buf.close()
+    return exfor_dic
+
+
+def iter_exfor(filename, parse_opts=None):
+    """Yield (entryid, entry) tuples one ENTRY block at a time."""
+    for _, f in iter_text_streams(filename):
+        for block in iter_entry_blocks(f):
+            yield parse_entry_block(block, parse_opts=parse_opts)
+
+
+def scan_exfor_entries(filename, entryids, parse_opts=None):
+    """Parse selected entries of a file that cannot be indexed."""
+    # compressed files cannot be accessed at byte offsets so
+    # we go through all blocks but parse only the selected ones
+    blocks = {}
+    for _, f in iter_text_streams(filename):
+        for block in iter_entry_blocks(f):
+            entryid = read_str_field(block[0], 1).strip()
+            if entryid in entryids:
+                blocks[entryid] = block
+    exfor_dic = {}
+    for entryid in entryids:
+        if entryid not in blocks:
+            raise KeyError(f"entry {entryid} not found in {filename}")
+        exfor_dic[entryid], _ = parse_entry(blocks[entryid], parse_opts=parse_opts)
+    return exfor_dic
+
+
+def write_exfor(filename, exfor_dic, overwrite=False, compress=None):
+    with ExforWriter(filename, overwrite=overwrite, compress=compress) as writer:
+        writer.write_entries(exfor_dic)
+
+
+class ExforWriter:
+    """Write entries to an EXFOR file as soon as they are available.
+
+    Only the lines of the entry being written are held in
+    memory, so that together with iter_exfor and the trafos
+    libraries can be converted in constant memory.
+    With compress="gzip", the output is gzip compressed.
+    The entries are written to a temporary file in the same
+    directory, which replaces the file on close. If an error
+    occurs in a with statement, or discard is called, the
+    temporary file is removed and the file is left untouched.
+    """
+
+    def __init__(self, filename, overwrite=False, compress=None):
+        if not overwrite and exists(filename):
+            raise FileExistsError(f"The file {filename} already exists")
+        if compress not in (None, "gzip"):
+            raise ValueError(f"unsupported compression {compress}")
+        dirname, basename = os.path.split(os.fspath(filename))
+        tmpname = os.path.join(dirname, f".{basename}.{uuid4().hex}.tmp")
+        if compress is None:
+            self._file = open(tmpname, "x")
+        else:
+            self._file = gzip.open(tmpname, "xt")
+        self.filename = filename
+        self._tmpname = tmpname
+        self._ofs = 0
 
+    def __enter__(self):
+        return self
 
-def write_exfor(filename, exfor_dic, overwrite=False):
-    if not overwrite and exists(filename):
-        raise FileExistsError(f"The file {filename} already exists")
-    lines = to_exfor(exfor_dic)
-    with open(filename, "w") as f:
-        f.write("\n".join(lines))
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            self._file.close()
+        except BaseException:
+            os.remove(self._tmpname)
+            raise
+        os.replace(self._tmpname, self.filename)
+
+    def discard(self):
+        """Close the writer without creating or changing the file."""
+        if self._file.closed:
+            return
+        self._file.close()
+        os.remove(self._tmpname)
+
+    def write_entry(self, entry):
+        lines, ofs = output_entry(entry, self._ofs)
+        # lines are separated but not terminated
+        # by a newline in keeping with to_exfor
+        if self._ofs > 0:
+            self._file.write("\n")
+        self._file.write("\n".join(lines))
+        self._ofs = ofs
+
+    def write_entries(self, entries):
+        """Write a dictionary or an iterable of (entryid, entry) tuples."""
+        if is_dic(entries):
+            entries = entries.items()
+        for _, entry in entries:
+            self.write_entry(entry)
@@ -0,0 +1,384 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+import json
+from copy import deepcopy
+from os.path import exists
+import numpy as np
+from .exfor_diff import columns_to_rows
+from .utils.alignment import compute_row_edit_path
+from .utils.comparison_utils import is_blank_value, is_same_content
+from .utils.convenience import contains_pointers, is_array, uses_array_backend
+from .utils.copy_utils import copy_for_trafo
+
+
+PATCH_KEYS = (
+    "op",
+    "entry",
+    "subentry",
+    "section",
+    "block",
+    "field",
+    "pointer",
+    "row",
+    "old",
+    "new",
+)
+
+
+def make_patch_record(op, entry, **kwargs):
+    record = dict.fromkeys(PATCH_KEYS)
+    record["op"] = op
+    record["entry"] = entry
+    for key, value in kwargs.items():
+        if key not in record:
+            raise KeyError(f"{key} is not a field of a patch record")
+        record[key] = value
+    record["old"] = to_python(record["old"])
+    record["new"] = to_python(record["new"])
+    return record
+
+
+def to_python(value):
+    # the records only contain plain Python values so that they
+    # can be stored as JSON, with blanks represented by None
+    if is_array(value):
+        return [to_python(v) for v in value.tolist()]
+    elif isinstance(value, dict):
+        return {k: to_python(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [to_python(v) for v in value]
+    elif isinstance(value, np.generic):
+        return to_python(value.item())
+    elif is_blank_value(value):
+        return None
+    return value
+
+
+def to_array_backend(value):
+    # counterpart of to_python for the columns of array blocks
+    if isinstance(value, dict):
+        return {k: to_array_backend(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return np.array([np.nan if v is None else v for v in value], dtype=np.float64)
+    return np.nan if value is None else value
+
+
+def flatten_columns(dic):
+    # map (field, pointer) to the content, with pointer None
+    # for fields without pointers
+    columns = {}
+    for field, cont in dic.items():
+        if contains_pointers(cont):
+            for pointer, value in cont.items():
+                columns[(field, pointer)] = value
+        else:
+            columns[(field, None)] = cont
+    return columns
+
+
+def unflatten_columns(columns):
+    dic = {}
+    for (field, pointer), value in columns.items():
+        if pointer is None:
+            dic[field] = value
+        else:
+            dic.setdefault(field, {})[pointer] = value
+    return dic
+
+
+def sort_column_keys(keys):
+    return sorted(keys, key=lambda k: (k[0], "" if k[1] is None else k[1]))
+
+
+def iter_entry_patch(entryid, entry1, entry2):
+    subentids = sorted(set(entry1).union(entry2))
+    for subentid in subentids:
+        if subentid not in entry2:
+            old = entry1[subentid]
+            yield make_patch_record("remove", entryid, subentry=subentid, old=old)
+        elif subentid not in entry1:
+            new = entry2[subentid]
+            yield make_patch_record("add", entryid, subentry=subentid, new=new)
+        elif not is_same_content(entry1[subentid], entry2[subentid]):
+            subent1 = entry1[subentid]
+            subent2 = entry2[subentid]
+            yield from iter_subentry_patch(entryid, subentid, subent1, subent2)
+
+
+def iter_subentry_patch(entryid, subentid, subent1, subent2):
+    sections = list(subent1) + [k for k in subent2 if k not in subent1]
+    for section in sections:
+        ids = {"subentry": subentid, "section": section}
+        if section not in subent2:
+            yield make_patch_record("remove", entryid, **ids, old=subent1[section])
+        elif section not in subent1:
+            yield make_patch_record("add", entryid, **ids, new=subent2[section])
+        elif is_same_content(subent1[section], subent2[section]):
+            continue
+        elif section == "BIB":
+            yield from iter_bib_patch(entryid, ids, subent1[section], subent2[section])
+        elif section in ("COMMON", "DATA"):
+            yield from iter_common_or_data_patch(
+                entryid, ids, subent1[section], subent2[section]
+            )
+        else:
+            old = subent1[section]
+            new = subent2[section]
+            yield make_patch_record("replace", entryid, **ids, old=old, new=new)
+
+
+def iter_bib_patch(entryid, ids, bib1, bib2):
+    fields = sorted(set(bib1).union(bib2))
+    for field in fields:
+        if field not in bib2:
+            yield make_patch_record(
+                "remove", entryid, **ids, field=field, old=bib1[field]
+            )
+            continue
+        elif field not in bib1:
+            yield make_patch_record("add", entryid, **ids, field=field, new=bib2[field])
+            continue
+        cont1 = bib1[field]
+        cont2 = bib2[field]
+        if is_same_content(cont1, cont2):
+            continue
+        if not contains_pointers(cont1) or not contains_pointers(cont2):
+            yield make_patch_record(
+                "replace", entryid, **ids, field=field, old=cont1, new=cont2
+            )
+            continue
+        for pointer in sorted(set(cont1).union(cont2)):
+            curids = {**ids, "field": field, "pointer": pointer}
+            if pointer not in cont2:
+                yield make_patch_record("remove", entryid, **curids, old=cont1[pointer])
+            elif pointer not in cont1:
+                yield make_patch_record("add", entryid, **curids, new=cont2[pointer])
+            elif not is_same_content(cont1[pointer], cont2[pointer]):
+                old = cont1[pointer]
+                new = cont2[pointer]
+                yield make_patch_record("replace", entryid, **curids, old=old, new=new)
+
+
+def iter_common_or_data_patch(entryid, ids, datadic1, datadic2):
+    # columns are removed first and added last so that
+    # the row operations in between only involve the
+    # columns present in both versions
+    added = []
+    shared = []
+    for block in ("UNIT", "DATA"):
+        columns1 = flatten_columns(datadic1[block])
+        columns2 = flatten_columns(datadic2[block])
+        for key in sort_column_keys(set(columns1).union(columns2)):
+            curids = {**ids, "block": block, "field": key[0], "pointer": key[1]}
+            if key not in columns2:
+                old = columns1[key]
+                yield make_patch_record("remove", entryid, **curids, old=old)
+            elif key not in columns1:
+                added.append(
+                    make_patch_record("add", entryid, **curids, new=columns2[key])
+                )
+            elif block == "DATA" and ids["section"] == "DATA":
+                shared.append(key)
+            elif not is_same_content(columns1[key], columns2[key]):
+                old = columns1[key]
+                new = columns2[key]
+                yield make_patch_record("replace", entryid, **curids, old=old, new=new)
+    if len(shared) > 0:
+        columns1 = flatten_columns(datadic1["DATA"])
+        columns2 = flatten_columns(datadic2["DATA"])
+        columns1 = [columns1[key] for key in shared]
+        columns2 = [columns2[key] for key in shared]
+        yield from iter_data_row_patch(entryid, ids, shared, columns1, columns2)
+    yield from added
+
+
+def iter_data_row_patch(entryid, ids, keys, columns1, columns2):
+    """Yield the row operations turning one table into another.
+
+    The rows are aligned as in exfor_diff. The row indices
+    refer to the table after applying all preceding records,
+    hence to the new table for added and replaced rows.
+    """
+    ids = {**ids, "block": "DATA"}
+    rows1 = columns_to_rows(columns1, len(columns1[0]))
+    rows2 = columns_to_rows(columns2, len(columns2[0]))
+    path = compute_row_edit_path(rows1, rows2)
+    pos1 = np.cumsum(path != "i") - 1
+    pos2 = np.cumsum(path != "d") - 1
+    # the alignment tolerates rounding noise but the patch
+    # has to reproduce the values exactly
+    paired = (path == "k") | (path == "s")
+    vals1 = rows1[pos1[paired]]
+    vals2 = rows2[pos2[paired]]
+    differs = (vals1 != vals2) & ~(np.isnan(vals1) & np.isnan(vals2))
+    changed = ~paired
+    changed[paired] = differs.any(axis=1)
+    paired_idx = np.cumsum(paired) - 1
+    for k in np.nonzero(changed)[0]:
+        i = pos1[k]
+        j = pos2[k]
+        if path[k] == "d":
+            old = unflatten_columns({key: c[i] for key, c in zip(keys, columns1)})
+            yield make_patch_record("remove", entryid, **ids, row=int(j + 1), old=old)
+        elif path[k] == "i":
+            new = unflatten_columns({key: c[j] for key, c in zip(keys, columns2)})
+            yield make_patch_record("add", entryid, **ids, row=int(j), new=new)
+        else:
+            for c in np.nonzero(differs[paired_idx[k]])[0]:
+                curids = {**ids, "field": keys[c][0], "pointer": keys[c][1]}
+                old = columns1[c][i]
+                new = columns2[c][j]
+                yield make_patch_record(
+                    "replace", entryid, **curids, row=int(j), old=old, new=new
+                )
+
+
+def iter_exfor_patch(exfor_dic1, exfor_dic2):
+    """Yield the changes between two EXFOR dictionaries.
+
+    Each change is a record with the keys in PATCH_KEYS. The
+    op is add, remove or replace, and entry, subentry, section,
+    block, field, pointer and row locate the changed element
+    in the nested dictionary, where the keys below the changed
+    element are None. Table rows are aligned as in exfor_diff,
+    so that an inserted row results in a single record. The
+    values are plain Python objects with None for blanks,
+    also for dictionaries read with the array backend.
+    """
+    entryids = sorted(set(exfor_dic1.keys()).union(exfor_dic2.keys()))
+    for entryid in entryids:
+        if entryid not in exfor_dic2:
+            yield make_patch_record("remove", entryid, old=exfor_dic1[entryid])
+        elif entryid not in exfor_dic1:
+            yield make_patch_record("add", entryid, new=exfor_dic2[entryid])
+        else:
+            entry1 = exfor_dic1[entryid]
+            entry2 = exfor_dic2[entryid]
+            if not is_same_content(entry1, entry2):
+                yield from iter_entry_patch(entryid, entry1, entry2)
+
+
+def exfor_patch(exfor_dic1, exfor_dic2):
+    return list(iter_exfor_patch(exfor_dic1, exfor_dic2))
+
+
+def apply_patch_record(exfor_dic, record):
+    op = record["op"]
+    if op not in ("add", "remove", "replace"):
+        raise ValueError(f"unknown patch operation {op}")
+    # descend to the container of the changed element
+    path = [record["entry"]]
+    for key in ("subentry", "section", "block", "field", "pointer"):
+        if record[key] is not None:
+            path.append(record[key])
+    row = record["row"]
+    if record["field"] is None and row is not None:
+        apply_row_record(exfor_dic, path, record)
+        return
+    if row is not None:
+        path.append(row)
+    new = record["new"]
+    if record["block"] == "DATA" and is_array_block(exfor_dic, record):
+        new = to_array_backend(new)
+    else:
+        new = deepcopy(new)
+    parents = [exfor_dic]
+    for key in path[:-1]:
+        cont = parents[-1]
+        if key not in cont and op == "add":
+            cont[key] = {}
+        parents.append(cont[key])
+    cont = parents[-1]
+    if op == "remove":
+        del cont[path[-1]]
+        # drop pointer dictionaries that became empty
+        if record["pointer"] is not None and len(cont) == 0:
+            del parents[-2][path[-2]]
+    else:
+        cont[path[-1]] = new
+
+
+def is_array_block(exfor_dic, record):
+    subent = exfor_dic[record["entry"]][record["subentry"]]
+    section = record["section"]
+    return section == "DATA" and uses_array_backend(subent[section])
+
+
+def apply_row_record(exfor_dic, path, record):
+    block = exfor_dic
+    for key in path:
+        block = block[key]
+    row = record["row"]
+    columns = flatten_columns(block)
+    if record["op"] == "remove":
+        for key, column in columns.items():
+            if is_array(column):
+                set_column(block, key, np.delete(column, row))
+            else:
+                del column[row]
+    elif record["op"] == "add":
+        for key, value in flatten_columns(record["new"]).items():
+            column = columns[key]
+            if is_array(column):
+                value = np.nan if value is None else value
+                set_column(block, key, np.insert(column, row, value))
+            else:
+                column.insert(row, value)
+    else:
+        raise ValueError("rows can only be added or removed")
+
+
+def set_column(dic, key, column):
+    field, pointer = key
+    if pointer is None:
+        dic[field] = column
+    else:
+        dic[field][pointer] = column
+
+
+def apply_exfor_patch(exfor_dic, patch, inplace=False):
+    """Apply the records produced by exfor_patch.
+
+    The records have to be applied in the order in which
+    they were produced. Fields and columns that are added
+    are appended to the dictionaries, so the key order can
+    differ from the one in the second dictionary of the
+    comparison. Values inserted into the DATA columns of the
+    array backend are converted to arrays with NaN for blanks.
+    Only the subentries touched by the patch are copied unless
+    inplace is True.
+    """
+    patch = list(patch)
+    touched = set(r["subentry"] for r in patch if r["subentry"] is not None)
+    exfor_dic = copy_for_trafo(
+        exfor_dic,
+        inplace,
+        share_unmodified=True,
+        modifies=lambda subent: subent["__subentid"] in touched,
+    )
+    for record in patch:
+        apply_patch_record(exfor_dic, record)
+    return exfor_dic
+
+
+def write_exfor_patch(filename, exfor_dic1, exfor_dic2, overwrite=False):
+    """Write the changes as JSON lines, one record per line."""
+    if not overwrite and exists(filename):
+        raise FileExistsError(f"The file {filename} already exists")
+    with open(filename, "w") as f:
+        for record in iter_exfor_patch(exfor_dic1, exfor_dic2):
+            f.write(json.dumps(record) + "\n")
+
+
+def read_exfor_patch(filename):
+    with open(filename, "r") as f:
+        for line in f:
+            yield json.loads(line)
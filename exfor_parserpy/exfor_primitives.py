@@ -7,7 +7,11 @@
 # License:      MIT
 #
 ############################################################
-from .utils.fortran_utils import fortstr2float
+import numpy as np
+from .utils.fortran_utils import fortstr2float, read_fort_float_table
+
+
+BLANK_FIELD = " " * 11
 
 
 def read_str_field(line, pos, width=1, trim=True):
@@ -44,7 +48,8 @@ def read_float_field(line, pos, width=1):
 
 
 def write_float_field(line, pos, num, width=1):
-    if num is not None:
+    # NaN represents a blank field in the array backend
+    if num is not None and num == num:
         valstr = "{:11.5g}".format(num).ljust(width * 11)
     else:
         valstr = ""
@@ -75,13 +80,16 @@ def write_bib_element(fieldkey, pointer, content, outkey=True):
     # splitlines will ignore it
     if content.endswith("\n"):
         content_lines.append("")
-    curline = write_pointered_field("", 0, fieldkey, pointer, outkey)
-    curline = write_str_field(curline, 1, content_lines[0], width=5)
+    keystr = fieldkey.ljust(10) if outkey else " " * 10
+    keystr += pointer[0] if pointer else " "
+    if len(keystr) == 11 and len(content_lines[0]) <= 55:
+        curline = keystr + content_lines[0].ljust(55)
+    else:
+        curline = write_pointered_field("", 0, fieldkey, pointer, outkey)
+        curline = write_str_field(curline, 1, content_lines[0], width=5)
     newlines = [curline]
-    if len(content_lines) > 1:
-        for i, curcont in enumerate(content_lines[1:]):
-            curline = write_str_field("", 1, curcont, width=5)
-            newlines.append(curline)
+    for curcont in content_lines[1:]:
+        newlines.append(BLANK_FIELD + curcont.ljust(55))
     return newlines
 
 
@@ -107,29 +115,85 @@ def read_fields(lines, num, ofs, dtype="str"):
     return fields, ofs
 
 
+def read_float_columns(lines, num, numrows, ofs, as_arrays=False):
+    """Read a table of floats and return it column-wise.
+
+    The fast vectorized conversion is attempted first and
+    the field-by-field conversion serves as fallback for
+    tables with unusual content. If as_arrays is True,
+    the columns are float64 arrays with NaN for blank fields
+    instead of lists with None."""
+    numlines = numrows * ((num + 5) // 6)
+    try:
+        values, blank = read_fort_float_table(lines[ofs : ofs + numlines], num)
+        if len(values) != numrows:
+            raise ValueError("missing records in table")
+    except ValueError:
+        rows = []
+        for currow in range(numrows):
+            values, ofs = read_fields(lines, num, ofs, dtype="float")
+            rows.append(values)
+        columns = [list(col) for col in zip(*rows)]
+        if len(columns) == 0:
+            columns = [[] for i in range(num)]
+        if as_arrays:
+            columns = [np.array(col, dtype=np.float64) for col in columns]
+        return columns, ofs
+    if as_arrays:
+        columns = [values[:, i].copy() for i in range(num)]
+        return columns, ofs + numlines
+    columns = []
+    for i in range(num):
+        col = values[:, i].tolist()
+        for j in blank[:, i].nonzero()[0]:
+            col[j] = None
+        columns.append(col)
+    return columns, ofs + numlines
+
+
 def write_fields(fields, ofs, dtype="str"):
-    num = 0
+    if dtype == "strp":
+        strs = [
+            key.ljust(10) + (pointer[0] if pointer else " ") for key, pointer in fields
+        ]
+    elif dtype == "str":
+        strs = fields
+    elif dtype == "int":
+        strs = ["{:>11d}".format(val) for val in fields]
+    elif dtype == "float":
+        strs = format_float_fields(fields)
+    else:
+        raise TypeError("unknown dtype")
+    return write_field_lines(strs)
+
+
+def format_float_fields(values):
+    """Format numbers as 11-character fields, blank for None and NaN."""
+    return [
+        BLANK_FIELD if val is None or val != val else format(val, "11.5g")
+        for val in values
+    ]
+
+
+def write_field_lines(strs):
+    """Assemble lines of six fields from already formatted fields."""
     lines = []
-    while num < len(fields):
-        curnum = min(6, len(fields) - num)
-        curline = ""
-        for i in range(curnum):
-            curfield = fields[num + i]
-            if dtype == "strp":
-                curline = write_pointered_field(curline, i, curfield[0], curfield[1])
-            elif dtype == "str":
-                curline = write_str_field(curline, i, curfield)
-            elif dtype == "int":
-                curline = write_int_field(curline, i, curfield)
-            elif dtype == "float":
-                curline = write_float_field(curline, i, curfield)
-            else:
-                raise TypeError("unknown dtype")
-        lines.append(curline)
-        num += curnum
+    for num in range(0, len(strs), 6):
+        lines.append(join_fields(strs[num : num + 6]))
     return lines
 
 
+def join_fields(strs):
+    if max(map(len, strs), default=0) > 11:
+        # overlong fields are rare, so we let write_str_field
+        # reproduce its truncation behavior in this case
+        line = ""
+        for i, curstr in enumerate(strs):
+            line = write_str_field(line, i, curstr)
+        return line
+    return "".join([curstr.ljust(11) for curstr in strs]).ljust(66)
+
+
 def update_dic(dic, field, pointer, value, arr=False):
     if not pointer:
         if not arr:
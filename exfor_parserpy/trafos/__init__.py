@@ -5,3 +5,4 @@ from .detextify import detextify
 from .tablify import tablify
 from .reactify import reactify
 from .substituty import substituty
+from .pipeline import Pipeline
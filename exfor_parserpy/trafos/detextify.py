@@ -9,48 +9,64 @@
 #
 ############################################################
 
-from copy import deepcopy
 from ..utils.custom_iterators import exfor_iterator3
+from ..utils.copy_utils import copy_for_trafo
 from ..utils.convenience import is_subentry, contains_pointers, find_brackets
+from ..utils.profiling import profiled
 import re
 
 
-def detextify(exfor_dic, keep_original_field=False):
+@profiled("detextify")
+def detextify(
+    exfor_dic, keep_original_field=False, inplace=False, share_unmodified=False
+):
     """Strip the text from the bibliographic fields."""
-    ret_dic = deepcopy(exfor_dic)
+    ret_dic = copy_for_trafo(
+        exfor_dic, inplace, share_unmodified, modifies=lambda subent: "BIB" in subent
+    )
     outeriter = exfor_iterator3(ret_dic, filterfun=is_subentry)
     for subentid, subent, parent_of_subent in outeriter:
         if not is_subentry(subent, subentid):
             continue
-        if "BIB" not in subent:
-            continue
-        bibsec = subent["BIB"]
-        # the tupling is done because otherwise the
-        # iterator complains about changes to the dictionary
-        for fieldname, fieldcont in tuple(bibsec.items()):
-            # we skip for the time being the splitting
-            # of the REACTION field due to the increased
-            # complexity of the "reaction algebra"
-            if fieldname == "REACTION":
-                continue
-            code_fieldname = fieldname + "_codes"
-            text_fieldname = fieldname + "_texts"
-            if contains_pointers(fieldcont):
-                for curpointer, fieldcont2 in fieldcont.items():
-                    code_list, text_list = split_code_and_text(fieldcont2)
-                    bibsec.setdefault(code_fieldname, {})
-                    bibsec.setdefault(text_fieldname, {})
-                    bibsec[code_fieldname][curpointer] = code_list
-                    bibsec[text_fieldname][curpointer] = text_list
-            else:
-                code_list, text_list = split_code_and_text(fieldcont)
-                bibsec[code_fieldname] = code_list
-                bibsec[text_fieldname] = text_list
-            if not keep_original_field:
-                del bibsec[fieldname]
+        detextify_subentry(subent, keep_original_field)
     return ret_dic
 
 
+def detextify_stage(subentid, subent, context, keep_original_field=False):
+    """Pipeline stage of detextify for a single subentry."""
+    detextify_subentry(subent, keep_original_field)
+    return [(subentid, subent)]
+
+
+def detextify_subentry(subent, keep_original_field=False):
+    if "BIB" not in subent:
+        return
+    bibsec = subent["BIB"]
+    # the tupling is done because otherwise the
+    # iterator complains about changes to the dictionary
+    for fieldname, fieldcont in tuple(bibsec.items()):
+        # we skip for the time being the splitting
+        # of the REACTION field due to the increased
+        # complexity of the "reaction algebra"
+        if fieldname == "REACTION":
+            continue
+        code_fieldname = fieldname + "_codes"
+        text_fieldname = fieldname + "_texts"
+        if contains_pointers(fieldcont):
+            for curpointer, fieldcont2 in fieldcont.items():
+                code_list, text_list = split_code_and_text(fieldcont2)
+                bibsec.setdefault(code_fieldname, {})
+                bibsec.setdefault(text_fieldname, {})
+                bibsec[code_fieldname][curpointer] = code_list
+                bibsec[text_fieldname][curpointer] = text_list
+        else:
+            code_list, text_list = split_code_and_text(fieldcont)
+            bibsec[code_fieldname] = code_list
+            bibsec[text_fieldname] = text_list
+        if not keep_original_field:
+            del bibsec[fieldname]
+
+
 def split_code_and_text(string):
     # strategy: if there isn't an opening bracket
     # in the first position, the field contains free
@@ -0,0 +1,103 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from copy import deepcopy
+from ..utils.convenience import is_dic, is_subentry
+from ..utils.parallel import ordered_parallel_map
+from ..utils.profiling import profile_stage
+from .unitfy import unitfy, unitfy_stage
+from .uncommonfy import uncommonfy, uncommonfy_stage
+from .depointerfy import depointerfy, depointerfy_stage
+from .detextify import detextify, detextify_stage
+from .reactify import reactify, reactify_stage
+from .substituty import substituty, substituty_stage
+
+
+STAGES = {
+    unitfy: unitfy_stage,
+    uncommonfy: uncommonfy_stage,
+    depointerfy: depointerfy_stage,
+    detextify: detextify_stage,
+    reactify: reactify_stage,
+    substituty: substituty_stage,
+}
+
+
+class Pipeline:
+    """Chain of transformers applied in a single pass.
+
+    The transformers are given as a list whose elements are
+    either transformer functions, e.g., unitfy, or tuples of
+    a transformer function and a dictionary with its keyword
+    arguments, e.g., (depointerfy, {"delete_pointered_subents": False}).
+    Each subentry is copied once and then passed through all
+    transformers before the next subentry is visited.
+    """
+
+    def __init__(self, trafos, inplace=False):
+        self.stages = []
+        for trafo in trafos:
+            if isinstance(trafo, tuple):
+                trafo, kwargs = trafo
+            else:
+                kwargs = {}
+            if trafo in STAGES:
+                stage = STAGES[trafo]
+            elif trafo in STAGES.values():
+                stage = trafo
+            else:
+                raise TypeError(f"{trafo} cannot be used in a pipeline")
+            self.stages.append((stage, kwargs))
+        self.inplace = inplace
+
+    def __call__(self, exfor_dic, workers=None):
+        """Transform a dictionary with entries."""
+        entries = self.iterate(exfor_dic.items(), workers=workers)
+        return {entryid: entry for entryid, entry in entries}
+
+    def iterate(self, entries, workers=None):
+        """Transform (entryid, entry) tuples as they come in,
+        e.g., from iter_exfor, and yield the results."""
+        if workers is not None and workers > 1:
+            yield from ordered_parallel_map(self.process_item, entries, workers)
+        else:
+            for item in entries:
+                yield self.process_item(item)
+
+    def process_item(self, item):
+        entryid, entry = item
+        with profile_stage("pipeline.entry", entryid):
+            return entryid, self.process_entry(entry)
+
+    def process_entry(self, entry):
+        """Transform the subentries of a single entry."""
+        contexts = [{} for _ in self.stages]
+        ret_entry = {}
+        for subentid, subent in entry.items():
+            if not is_dic(subent) or not is_subentry(subent, subentid):
+                ret_entry[subentid] = subent
+                continue
+            if not self.inplace:
+                subent = deepcopy(subent)
+            items = [(subentid, subent)]
+            for (stage, kwargs), context in zip(self.stages, contexts):
+                newitems = []
+                with profile_stage("pipeline." + stage.__name__):
+                    for cursubentid, cursubent in items:
+                        newitems.extend(
+                            stage(cursubentid, cursubent, context, **kwargs)
+                        )
+                items = newitems
+            ret_entry.update(items)
+        if self.inplace:
+            entry.clear()
+            entry.update(ret_entry)
+            return entry
+        return ret_entry
@@ -8,33 +8,50 @@
 #
 ############################################################
 
-from copy import deepcopy
 from ..utils.convenience import find_brackets, is_subentry, contains_pointers
 from ..utils.custom_iterators import exfor_iterator3
+from ..utils.copy_utils import copy_for_trafo
+from ..utils.profiling import profiled
 
 
-def reactify(exfor_dic, reacexpr_field="reaction_expr"):
-    ret_dic = deepcopy(exfor_dic)
+@profiled("reactify")
+def reactify(
+    exfor_dic, reacexpr_field="reaction_expr", inplace=False, share_unmodified=False
+):
+    def modifies(subent):
+        return "BIB" in subent and "REACTION" in subent["BIB"]
+
+    ret_dic = copy_for_trafo(exfor_dic, inplace, share_unmodified, modifies)
     outeriter = exfor_iterator3(ret_dic, filterfun=is_subentry)
     for subentid, subent, parent_of_subent in outeriter:
         if not is_subentry(subent, subentid):
             continue
-        if "BIB" not in subent:
-            continue
-        if "REACTION" not in subent["BIB"]:
-            continue
-        bibsec = subent["BIB"]
-        if not contains_pointers(bibsec["REACTION"]):
-            bibsec[reacexpr_field] = parse_reaction_expression(bibsec["REACTION"])
-        else:
-            bibsec[reacexpr_field] = {}
-            for pt, reacstr in bibsec["REACTION"].items():
-                bibsec[reacexpr_field][pt] = bibsec[reacexpr_field][
-                    pt
-                ] = parse_reaction_expression(reacstr)
+        reactify_subentry(subent, reacexpr_field)
     return ret_dic
 
 
+def reactify_stage(subentid, subent, context, reacexpr_field="reaction_expr"):
+    """Pipeline stage of reactify for a single subentry."""
+    reactify_subentry(subent, reacexpr_field)
+    return [(subentid, subent)]
+
+
+def reactify_subentry(subent, reacexpr_field="reaction_expr"):
+    if "BIB" not in subent:
+        return
+    if "REACTION" not in subent["BIB"]:
+        return
+    bibsec = subent["BIB"]
+    if not contains_pointers(bibsec["REACTION"]):
+        bibsec[reacexpr_field] = parse_reaction_expression(bibsec["REACTION"])
+    else:
+        bibsec[reacexpr_field] = {}
+        for pt, reacstr in bibsec["REACTION"].items():
+            bibsec[reacexpr_field][pt] = bibsec[reacexpr_field][
+                pt
+            ] = parse_reaction_expression(reacstr)
+
+
 def parse_reaction(reaction_str):
     reacinfo = {}
     nuclide = reaction_str[: reaction_str.index("(")]
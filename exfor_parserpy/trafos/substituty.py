@@ -9,7 +9,7 @@
 #
 ############################################################
 
-from copy import deepcopy
+from ..utils.copy_utils import copy_for_trafo
 
 
 def substituty(
@@ -20,9 +20,15 @@ def substituty(
     keep_original=True,
     return_copy=True,
     na_value="unknown",
+    inplace=False,
+    share_unmodified=False,
 ):
-    if return_copy:
-        exfor_dic = deepcopy(exfor_dic)
+    if return_copy and not inplace:
+        exfor_dic = copy_for_trafo(
+            exfor_dic,
+            share_unmodified=share_unmodified,
+            modifies=lambda subent: contains_key(subent, key),
+        )
 
     if isinstance(exfor_dic, dict):
         key_list = tuple(exfor_dic)
@@ -64,3 +70,19 @@ def substituty(
             )
 
     return exfor_dic
+
+
+def substituty_stage(subentid, subent, context, key, replace_dict, **kwargs):
+    """Pipeline stage of substituty for a single subentry."""
+    substituty(subent, key, replace_dict, return_copy=False, **kwargs)
+    return [(subentid, subent)]
+
+
+def contains_key(obj, key):
+    if isinstance(obj, dict):
+        if key in obj:
+            return True
+        return any(contains_key(curel, key) for curel in obj.values())
+    elif hasattr(obj, "__iter__") and not isinstance(obj, str):
+        return any(contains_key(curel, key) for curel in obj)
+    return False
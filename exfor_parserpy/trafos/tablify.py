@@ -11,12 +11,50 @@
 import pandas as pd
 import numpy as np
 import re
-from ..utils.convenience import is_dic, contains_pointers, is_subentry
+import json
+import os
+from ..utils.convenience import is_array, is_dic, contains_pointers, is_subentry
 from ..utils.custom_iterators import exfor_iterator3
+from ..utils.parallel import ordered_parallel_map
+from ..utils.profiling import profiled, profile_stage
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
 
-def tablify(exfor_dic, sep=".", pointersep="#", keep_toplevel=False):
-    """Convert EXFOR entry to table."""
+
+@profiled("tablify")
+def tablify(
+    exfor_dic,
+    sep=".",
+    pointersep="#",
+    keep_toplevel=False,
+    columnar=False,
+    workers=None,
+):
+    """Convert EXFOR entry to table.
+
+    With columnar=True, the columns of all entries are collected
+    first and the DataFrame is created once at the end. In this mode,
+    a field present in both the first and another subentry of an entry
+    appears only once and the value of the other subentry takes
+    precedence. The entries can then also be processed in several
+    worker processes by passing workers."""
+    if columnar or (workers is not None and workers > 1):
+        tables = iter_tablify(
+            exfor_dic,
+            sep=sep,
+            pointersep=pointersep,
+            keep_toplevel=keep_toplevel,
+            output="columns",
+            workers=workers,
+        )
+        tables = [table for _, table in tables]
+        with profile_stage("tablify.concat"):
+            return pd.DataFrame(concat_columns(tables))
     # first traverse the nested dictionary and locate
     # all the subentries. Retrieve tuples of column
     # names and content from them.
@@ -151,3 +189,288 @@ def column_transformer(colname, content, sep, pointersep, keep_toplevel=False):
         return "SUBENTRY", content
 
     return colname, content
+
+
+def iter_tablify(
+    exfor_dic,
+    sep=".",
+    pointersep="#",
+    keep_toplevel=False,
+    output="pandas",
+    workers=None,
+):
+    """Yield (entryid, table) tuples, one for each entry.
+
+    The first argument is either a dictionary with entries or
+    an iterable of (entryid, entry) tuples, e.g., from iter_exfor.
+    The table is a DataFrame if output is pandas, an Arrow record
+    batch if output is arrow and a dictionary with the columns
+    if output is columns. Entries without subentries other than
+    the first one are skipped."""
+    if output not in ("pandas", "arrow", "columns"):
+        raise ValueError(f"unknown output type {output}")
+    if output == "arrow" and pa is None:
+        raise ImportError("pyarrow is required for output=arrow")
+    if is_dic(exfor_dic):
+        entries = group_subentries_by_entry(exfor_dic).items()
+    else:
+        entries = exfor_dic
+    tabfun = EntryTablifier(sep, pointersep, keep_toplevel, output)
+    if workers is not None and workers > 1:
+        tables = ordered_parallel_map(tabfun, entries, workers)
+    else:
+        tables = (tabfun(item) for item in entries)
+    for entryid, table in tables:
+        if table is not None:
+            yield entryid, table
+
+
+class EntryTablifier:
+    """Picklable function to convert (entryid, entry) tuples to tables."""
+
+    def __init__(self, sep, pointersep, keep_toplevel, output):
+        self.sep = sep
+        self.pointersep = pointersep
+        self.keep_toplevel = keep_toplevel
+        self.output = output
+
+    def __call__(self, item):
+        entryid, entry = item
+        columns = tablify_entry(entry, self.sep, self.pointersep, self.keep_toplevel)
+        if columns is None:
+            return entryid, None
+        if self.output == "pandas":
+            return entryid, pd.DataFrame(columns)
+        elif self.output == "arrow":
+            return entryid, columns_to_record_batch(columns)
+        return entryid, columns
+
+
+def group_subentries_by_entry(exfor_dic):
+    entries = {}
+    outeriter = exfor_iterator3(exfor_dic, filterfun=is_subentry)
+    for subentid, subent, parent_of_subent in outeriter:
+        if not is_subentry(subent, subentid):
+            continue
+        entryid = subent.get("__entryid", subentid[:5])
+        entries.setdefault(entryid, {})[subentid] = subent
+    return entries
+
+
+@profiled("tablify.entry")
+def tablify_entry(entry, sep=".", pointersep="#", keep_toplevel=False):
+    """Convert the subentries of an entry to columns of equal length."""
+    first_tables = []
+    other_tables = []
+    for subentid, subent in entry.items():
+        if not is_subentry(subent, subentid):
+            continue
+        cur_table_dic = {}
+        coliter = column_iterator(subent, sep=sep, pointersep=pointersep)
+        for col, cont in coliter:
+            tcol, tcont = column_transformer(col, cont, sep, pointersep, keep_toplevel)
+            if tcol is not None:
+                cur_table_dic[tcol] = tcont
+        if subentid[5:8] == "001":
+            first_tables.append(broadcast_columns(cur_table_dic))
+        else:
+            other_tables.append(broadcast_columns(cur_table_dic))
+    if len(other_tables) == 0:
+        return None
+    # the information of the first subentry is added to the rows
+    # of the other subentries but only the columns without
+    # missing values are considered
+    first_columns = {}
+    if len(first_tables) > 0:
+        first_table = concat_columns(first_tables[:1])
+        for col, cont in first_table.items():
+            if col not in ("ENTRY", "SUBENTRY") and not any(is_missing(cont)):
+                first_columns[col] = cont
+    tables = []
+    for cur_table_dic in other_tables:
+        numrows = get_num_rows(cur_table_dic)
+        cur_first_columns = {}
+        for col, cont in first_columns.items():
+            if numrows % len(cont) != 0:
+                raise IndexError("unable to merge rows of the first subentry")
+            nrep = numrows // len(cont)
+            cur_first_columns[col] = repeat_column(cont, nrep)
+        tables.append({**cur_first_columns, **cur_table_dic})
+    columns = concat_columns(tables)
+    # drop columns without any value in this entry
+    columns = {k: v for k, v in columns.items() if not all(is_missing(v))}
+    # move entry and subentry column to front
+    first_cols = ["ENTRY", "SUBENTRY"]
+    ordered_cols = first_cols + [x for x in columns if x not in first_cols]
+    return {col: columns[col] for col in ordered_cols if col in columns}
+
+
+def is_missing(cont):
+    if is_array(cont) and cont.dtype.kind == "f":
+        return np.isnan(cont)
+    return np.array([x is None or x != x for x in cont], dtype=bool)
+
+
+def get_num_rows(table_dic):
+    numrows = 1
+    for cont in table_dic.values():
+        if is_array(cont) or isinstance(cont, list):
+            numrows = len(cont)
+            break
+    return numrows
+
+
+def broadcast_columns(table_dic):
+    numrows = get_num_rows(table_dic)
+    newdic = {}
+    for col, cont in table_dic.items():
+        if is_array(cont) or isinstance(cont, list):
+            if len(cont) != numrows:
+                raise ValueError("All arrays must be of the same length")
+            newdic[col] = cont
+        else:
+            newdic[col] = [cont] * numrows
+    return newdic
+
+
+def repeat_column(cont, nrep):
+    if nrep == 1:
+        return cont
+    if is_array(cont):
+        return np.repeat(cont, nrep)
+    return [x for x in cont for _ in range(nrep)]
+
+
+def concat_columns(tables):
+    """Concatenate dictionaries with columns of equal length.
+
+    Columns missing in some of the tables are filled with
+    NaN for float arrays and None otherwise."""
+    chunks = {}
+    numrows = 0
+    for table in tables:
+        curnumrows = get_num_rows(table) if len(table) > 0 else 0
+        for col, cont in table.items():
+            if col not in chunks:
+                chunks[col] = [numrows] if numrows > 0 else []
+            chunks[col].append(cont)
+        for col, curchunks in chunks.items():
+            if col not in table:
+                curchunks.append(curnumrows)
+        numrows += curnumrows
+    # the placeholders for missing values are only resolved now
+    # as we need to know if the column only contains float arrays
+    columns = {}
+    for col, curchunks in chunks.items():
+        is_float_col = all(
+            is_array(c) and c.dtype.kind == "f" for c in curchunks if not is_int(c)
+        )
+        if is_float_col:
+            curchunks = [np.full(c, np.nan) if is_int(c) else c for c in curchunks]
+            columns[col] = np.concatenate(curchunks)
+        else:
+            newcol = []
+            for c in curchunks:
+                newcol.extend([None] * c if is_int(c) else c)
+            columns[col] = newcol
+    return columns
+
+
+def is_int(obj):
+    return isinstance(obj, int)
+
+
+def write_parquet(
+    exfor_dic,
+    dirname,
+    entries_per_file=1000,
+    sep=".",
+    pointersep="#",
+    keep_toplevel=False,
+    workers=None,
+    overwrite=False,
+):
+    """Write the tablified entries to Parquet files.
+
+    The first argument is either a dictionary with entries or an
+    iterable of (entryid, entry) tuples, e.g., from iter_exfor.
+    Only the entries of one file are kept in memory before they
+    are written to the next file part-00000.parquet, part-00001.parquet,
+    etc. in the directory dirname. As the columns differ between
+    entries, the files can have different schemas and should be read
+    as one dataset with the schemas unified by pyarrow.unify_schemas.
+    Return the list of written files."""
+    if pa is None:
+        raise ImportError("pyarrow is required to write Parquet files")
+    os.makedirs(dirname, exist_ok=True)
+    existing = [f for f in os.listdir(dirname) if f.endswith(".parquet")]
+    if not overwrite and len(existing) > 0:
+        raise FileExistsError(f"The directory {dirname} contains Parquet files")
+    for f in existing:
+        os.remove(os.path.join(dirname, f))
+    tables = iter_tablify(
+        exfor_dic,
+        sep=sep,
+        pointersep=pointersep,
+        keep_toplevel=keep_toplevel,
+        output="arrow",
+        workers=workers,
+    )
+    filenames = []
+    batches = []
+
+    def flush():
+        filename = os.path.join(dirname, f"part-{len(filenames):05d}.parquet")
+        pq.write_table(concat_record_batches(batches), filename)
+        filenames.append(filename)
+        batches.clear()
+
+    for entryid, batch in tables:
+        batches.append(batch)
+        if len(batches) >= entries_per_file:
+            flush()
+    if len(batches) > 0:
+        flush()
+    return filenames
+
+
+def columns_to_record_batch(columns):
+    """Convert columns to an Arrow record batch with typed columns.
+
+    Numeric columns become float64 with nulls for blank fields
+    and string columns other than ENTRY and SUBENTRY are
+    dictionary-encoded as they contain many repeated values."""
+    arrays = []
+    for col, cont in columns.items():
+        if is_array(cont):
+            arr = pa.array(cont, type=pa.float64(), from_pandas=True)
+        elif all(is_number(x) for x in cont if x is not None):
+            arr = pa.array(cont, type=pa.float64(), from_pandas=True)
+        else:
+            strs = [to_str(x) for x in cont]
+            arr = pa.array(strs, type=pa.string())
+            if col not in ("ENTRY", "SUBENTRY"):
+                arr = arr.dictionary_encode()
+        arrays.append(arr)
+    return pa.RecordBatch.from_arrays(arrays, names=list(columns))
+
+
+def concat_record_batches(batches):
+    tables = [pa.Table.from_batches([b]) for b in batches]
+    try:
+        return pa.concat_tables(tables, promote_options="default")
+    except TypeError:
+        # pyarrow versions before 14.0
+        return pa.concat_tables(tables, promote=True)
+
+
+def is_number(x):
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def to_str(x):
+    if x is None or isinstance(x, str):
+        return x
+    # the output of some transformers, e.g., detextify,
+    # contains lists or dictionaries, which are stored as JSON
+    return json.dumps(x)
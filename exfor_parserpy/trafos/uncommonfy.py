@@ -9,21 +9,25 @@
 #
 ############################################################
 
-from copy import deepcopy
 from ..utils.custom_iterators import exfor_iterator2
+from ..utils.copy_utils import copy_for_trafo
+from ..utils.profiling import profiled
 from ..utils.convenience import (
     has_common_block,
     has_data_block,
-    count_points_in_datablock,
     merge_common_into_datablock,
 )
 
 
-def uncommonfy(exfor_dic, delete_common=True):
+@profiled("uncommonfy")
+def uncommonfy(exfor_dic, delete_common=True, inplace=False, share_unmodified=False):
     """Merge COMMON blocks into DATA blocks
     and get rid of them."""
-    # we do not want to change in place
-    ret_dic = deepcopy(exfor_dic)
+
+    def modifies(subent):
+        return has_data_block(subent) or (delete_common and has_common_block(subent))
+
+    ret_dic = copy_for_trafo(exfor_dic, inplace, share_unmodified, modifies)
     # locate all common blocks
     common_dic = {}
     for curkey, curdic in exfor_iterator2(ret_dic):
@@ -32,6 +36,7 @@ def uncommonfy(exfor_dic, delete_common=True):
             # so that we have a reference to the original
             # common block to easily remove it afterwards
             common_dic[curkey] = curdic
+    common_blocks = {k: d["COMMON"] for k, d in common_dic.items()}
     # merge all the common blocks
     for curkey, curdic in exfor_iterator2(ret_dic):
         if not has_data_block(curdic):
@@ -39,26 +44,42 @@ def uncommonfy(exfor_dic, delete_common=True):
         # the assumption here is that DATA and COMMON
         # blocks are at the top level of a subentry
         # so we know that curkey contains the subentry accession number.
-        datablock = curdic["DATA"]
-        numpoints = count_points_in_datablock(datablock)
-        # first incorporate the common block of the first subentry.
-        # we only match the first 8 characters to be robust
-        # against added suffixes due to pointers or similar
-        first_subid = curkey[:5] + "001"
-        first_subid_ext = first_subid + curkey[8:]
-        if first_subid_ext in common_dic:
-            first_subid = first_subid_ext
-
-        if first_subid in common_dic:
-            commonblock = common_dic[first_subid]["COMMON"]
-            merge_common_into_datablock(datablock, commonblock)
-        # deal with the common block of the current subentry
-        if curkey in common_dic:
-            commonblock = common_dic[curkey]["COMMON"]
-            merge_common_into_datablock(datablock, commonblock)
+        merge_common_blocks(curkey, curdic["DATA"], common_blocks)
     # finally delete all the common blocks if desired
     if delete_common:
         for k, d in common_dic.items():
             del d["COMMON"]
 
     return ret_dic
+
+
+def uncommonfy_stage(subentid, subent, context, delete_common=True):
+    """Pipeline stage of uncommonfy for a single subentry.
+
+    The COMMON blocks of the subentries already visited
+    are kept in the context so that the one of the first
+    subentry is available for all subsequent ones."""
+    common_blocks = context.setdefault("common_blocks", {})
+    if has_common_block(subent):
+        common_blocks[subentid] = subent["COMMON"]
+    if has_data_block(subent):
+        merge_common_blocks(subentid, subent["DATA"], common_blocks)
+    if delete_common and has_common_block(subent):
+        del subent["COMMON"]
+    return [(subentid, subent)]
+
+
+def merge_common_blocks(subentid, datablock, common_blocks):
+    # first incorporate the common block of the first subentry.
+    # we only match the first 8 characters to be robust
+    # against added suffixes due to pointers or similar
+    first_subid = subentid[:5] + "001"
+    first_subid_ext = first_subid + subentid[8:]
+    if first_subid_ext in common_blocks:
+        first_subid = first_subid_ext
+
+    if first_subid in common_blocks:
+        merge_common_into_datablock(datablock, common_blocks[first_subid])
+    # deal with the common block of the current subentry
+    if subentid in common_blocks:
+        merge_common_into_datablock(datablock, common_blocks[subentid])
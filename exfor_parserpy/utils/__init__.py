@@ -1,2 +1,2 @@
 from .custom_iterators import exfor_iterator
-from .convenience import apply_factor, is_dic, is_list, is_str
+from .convenience import apply_factor, is_array, is_dic, is_list, is_str
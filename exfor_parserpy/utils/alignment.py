@@ -0,0 +1,312 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from bisect import bisect_left
+import numpy as np
+
+
+# number of significant digits taken into account
+# to decide whether two numbers in a row are equal
+ROW_DIGITS = 12
+
+# maximal size of the edit matrix computed for a gap
+# between anchors, larger gaps are aligned row by row
+MAX_GAP_CELLS = 10**6
+
+# maximal size of the edit matrix computed for the
+# characters of the lines between two matching lines,
+# larger gaps are marked as changed without refinement
+MAX_TEXT_CELLS = 4 * 10**6
+
+
+def round_significant(arr, digits=ROW_DIGITS):
+    """Round the values of an array to a number of significant digits."""
+    arr = np.asarray(arr, dtype=float)
+    if digits is None:
+        return arr + 0.0
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        mag = np.floor(np.log10(np.abs(arr)))
+        mag[~np.isfinite(mag)] = 0
+        scale = 10.0 ** (digits - 1 - mag)
+        rounded = np.round(arr * scale) / scale
+    rounded = np.where(np.isfinite(rounded), rounded, arr)
+    # adding zero turns -0.0 into 0.0
+    return rounded + 0.0
+
+
+def compute_row_keys(arr):
+    # all NaN values have the same bit pattern
+    # after the assignment of np.nan
+    arr = arr.copy()
+    arr[np.isnan(arr)] = np.nan
+    return [row.tobytes() for row in np.ascontiguousarray(arr)]
+
+
+def count_differences(arr1, arr2):
+    # NaN values stand for empty fields and are equal
+    diff = arr1 != arr2
+    diff &= ~(np.isnan(arr1) & np.isnan(arr2))
+    return diff.sum(axis=-1)
+
+
+def iter_anchored_ranges(keys1, keys2, max_gap_cells=MAX_GAP_CELLS):
+    """Split two sequences into ranges of equal and of unmatched elements.
+
+    Yields tuples (kind, lo1, hi1, lo2, hi2) in order, where kind
+    is k for ranges of equal keys and g for the gaps in between.
+    After stripping common leading and trailing elements, ranges
+    whose edit matrix has more than max_gap_cells cells are split
+    at elements occurring exactly once in both sequences in the
+    manner of patience diff.
+    """
+    # tasks are processed last in first out and are either
+    # ranges to be split (r) or ranges ready to be yielded
+    tasks = [("r", 0, len(keys1), 0, len(keys2))]
+    while len(tasks) > 0:
+        kind, lo1, hi1, lo2, hi2 = tasks.pop()
+        if kind != "r":
+            yield kind, lo1, hi1, lo2, hi2
+            continue
+        numprefix = 0
+        while (
+            lo1 + numprefix < hi1
+            and lo2 + numprefix < hi2
+            and keys1[lo1 + numprefix] == keys2[lo2 + numprefix]
+        ):
+            numprefix += 1
+        if numprefix > 0:
+            yield "k", lo1, lo1 + numprefix, lo2, lo2 + numprefix
+            lo1 += numprefix
+            lo2 += numprefix
+        numsuffix = 0
+        while (
+            lo1 < hi1 - numsuffix
+            and lo2 < hi2 - numsuffix
+            and keys1[hi1 - numsuffix - 1] == keys2[hi2 - numsuffix - 1]
+        ):
+            numsuffix += 1
+        if numsuffix > 0:
+            hi1 -= numsuffix
+            hi2 -= numsuffix
+            tasks.append(("k", hi1, hi1 + numsuffix, hi2, hi2 + numsuffix))
+        if lo1 == hi1 and lo2 == hi2:
+            continue
+        if (hi1 - lo1 + 1) * (hi2 - lo2 + 1) <= max_gap_cells:
+            yield "g", lo1, hi1, lo2, hi2
+            continue
+        anchors = find_unique_anchors(keys1, keys2, lo1, hi1, lo2, hi2)
+        if len(anchors) == 0:
+            yield "g", lo1, hi1, lo2, hi2
+            continue
+        # the ranges between the anchors are
+        # pushed in reverse order onto the stack
+        ends = anchors + [(hi1, hi2)]
+        starts = [(lo1, lo2)] + [(i + 1, j + 1) for i, j in anchors]
+        for (i, j), (ni, nj) in reversed(list(zip(starts, ends))):
+            if ni < hi1:
+                tasks.append(("k", ni, ni + 1, nj, nj + 1))
+            if i < ni or j < nj:
+                tasks.append(("r", i, ni, j, nj))
+
+
+def compute_row_edit_path(rows1, rows2, digits=ROW_DIGITS, max_gap_cells=MAX_GAP_CELLS):
+    """Align the rows of two tables and return the edit path.
+
+    rows1 and rows2 are two-dimensional arrays with the same
+    number of columns. The edit path is an array with one of
+    the letters k (keep), s (substitute), d (delete) and
+    i (insert) for each step. Rows are compared by the hash
+    of their values rounded to a number of significant digits
+    and split into ranges by iter_anchored_ranges. The gaps
+    are aligned by an edit matrix with a cost of substitution
+    proportional to the number of differing values, or row by
+    row if the matrix would have more than max_gap_cells cells.
+    """
+    rows1 = round_significant(rows1, digits)
+    rows2 = round_significant(rows2, digits)
+    keys1 = compute_row_keys(rows1)
+    keys2 = compute_row_keys(rows2)
+    path = []
+    for kind, lo1, hi1, lo2, hi2 in iter_anchored_ranges(keys1, keys2, max_gap_cells):
+        if kind == "k":
+            path.extend(["k"] * (hi1 - lo1))
+        else:
+            path.extend(align_gap(rows1, rows2, lo1, hi1, lo2, hi2, max_gap_cells))
+    return np.array(path, dtype="U1")
+
+
+def find_unique_anchors(keys1, keys2, lo1, hi1, lo2, hi2):
+    # rows occurring exactly once in both ranges
+    counts = {}
+    for i in range(lo1, hi1):
+        cnt = counts.get(keys1[i])
+        counts[keys1[i]] = (i, 1) if cnt is None else (cnt[0], cnt[1] + 1)
+    matches = {}
+    for j in range(lo2, hi2):
+        cnt = counts.get(keys2[j])
+        if cnt is None or cnt[1] != 1:
+            continue
+        matches[keys2[j]] = None if keys2[j] in matches else (cnt[0], j)
+    pairs = sorted(p for p in matches.values() if p is not None)
+    return longest_increasing_pairs(pairs)
+
+
+def longest_increasing_pairs(pairs):
+    # patience sorting to find the longest subsequence
+    # of pairs increasing in the second element
+    if len(pairs) == 0:
+        return []
+    tails = []
+    tail_idcs = []
+    prev = [-1] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos > 0:
+            prev[k] = tail_idcs[pos - 1]
+        if pos == len(tails):
+            tails.append(j)
+            tail_idcs.append(k)
+        else:
+            tails[pos] = j
+            tail_idcs[pos] = k
+    result = []
+    k = tail_idcs[-1]
+    while k >= 0:
+        result.append(pairs[k])
+        k = prev[k]
+    result.reverse()
+    return result
+
+
+def align_gap(rows1, rows2, lo1, hi1, lo2, hi2, max_gap_cells=MAX_GAP_CELLS):
+    n = hi1 - lo1
+    m = hi2 - lo2
+    if n == 0 or m == 0:
+        return ["d"] * n + ["i"] * m
+    if (n + 1) * (m + 1) > max_gap_cells:
+        return align_gap_by_position(rows1, rows2, lo1, lo2, n, m)
+    return align_gap_by_edit_matrix(rows1[lo1:hi1], rows2[lo2:hi2])
+
+
+def align_gap_by_position(rows1, rows2, lo1, lo2, n, m):
+    k = min(n, m)
+    numdiff = count_differences(rows1[lo1 : lo1 + k], rows2[lo2 : lo2 + k])
+    path = ["k" if d == 0 else "s" for d in numdiff]
+    return path + ["d"] * (n - k) + ["i"] * (m - k)
+
+
+def align_gap_by_edit_matrix(rows1, rows2):
+    n = len(rows1)
+    m = len(rows2)
+    numfields = rows1.shape[1]
+    factor = 2 / numfields if numfields > 0 else 0.0
+    idcs = np.arange(m + 1, dtype=float)
+    mat = np.empty((n + 1, m + 1), dtype=float)
+    mat[0] = idcs
+    for i in range(n):
+        cost = count_differences(rows1[i], rows2) * factor
+        # best of deletion and substitution for each cell
+        # and then insertions from left to right, which
+        # is a running minimum of the shifted costs
+        best = np.empty(m + 1, dtype=float)
+        best[0] = i + 1
+        best[1:] = np.minimum(mat[i, 1:] + 1.0, mat[i, :-1] + cost)
+        mat[i + 1] = np.minimum.accumulate(best - idcs) + idcs
+    path = []
+    i = n
+    j = m
+    while i > 0 and j > 0:
+        numdiff = count_differences(rows1[i - 1], rows2[j - 1])
+        if abs(mat[i, j] - mat[i - 1, j - 1] - numdiff * factor) < 1e-9:
+            path.append("k" if numdiff == 0 else "s")
+            i -= 1
+            j -= 1
+        elif abs(mat[i, j] - mat[i - 1, j] - 1.0) < 1e-9:
+            path.append("d")
+            i -= 1
+        else:
+            path.append("i")
+            j -= 1
+    path.extend(["d"] * i)
+    path.extend(["i"] * j)
+    path.reverse()
+    return path
+
+
+def compute_text_edit_types(lines1, lines2, max_gap_cells=MAX_TEXT_CELLS):
+    """Determine which characters of two texts are kept, deleted or inserted.
+
+    Returns two arrays with the edit type of each character in
+    the concatenation of lines1 and lines2, respectively, with
+    k for kept characters and d and i for deleted and inserted
+    ones. The lines are aligned first and only the characters
+    of the lines between matching lines are compared, unless
+    their edit matrix exceeds max_gap_cells cells.
+    """
+    types1 = []
+    types2 = []
+    for kind, lo1, hi1, lo2, hi2 in iter_anchored_ranges(lines1, lines2, 0):
+        text1 = "".join(lines1[lo1:hi1])
+        text2 = "".join(lines2[lo2:hi2])
+        if kind == "k":
+            types1.append(np.full(len(text1), "k"))
+            types2.append(np.full(len(text2), "k"))
+            continue
+        path = compute_char_edit_path(text1, text2, max_gap_cells)
+        types1.append(path[path != "i"])
+        types2.append(path[path != "d"])
+    if len(types1) == 0:
+        return np.array([], dtype="U1"), np.array([], dtype="U1")
+    return np.concatenate(types1), np.concatenate(types2)
+
+
+def compute_char_edit_path(text1, text2, max_gap_cells=MAX_TEXT_CELLS):
+    """Return the shortest path of deletions and insertions between two strings.
+
+    If the edit matrix would have more than max_gap_cells cells,
+    all characters of text1 are deleted and those of text2 inserted.
+    """
+    n = len(text1)
+    m = len(text2)
+    if n == 0 or m == 0 or (n + 1) * (m + 1) > max_gap_cells:
+        return np.array(["d"] * n + ["i"] * m, dtype="U1")
+    chars1 = np.frombuffer(text1.encode("utf-32-le"), dtype=np.uint32)
+    chars2 = np.frombuffer(text2.encode("utf-32-le"), dtype=np.uint32)
+    idcs = np.arange(m + 1, dtype=np.int32)
+    mat = np.empty((n + 1, m + 1), dtype=np.int32)
+    mat[0] = idcs
+    nomatch = np.int32(n + m + 1)
+    for i in range(n):
+        # best of deletion and keeping a matching character
+        # and then insertions as running minimum, see
+        # align_gap_by_edit_matrix
+        best = np.empty(m + 1, dtype=np.int32)
+        best[0] = i + 1
+        keep = np.where(chars2 == chars1[i], mat[i, :-1], nomatch)
+        best[1:] = np.minimum(mat[i, 1:] + 1, keep)
+        mat[i + 1] = np.minimum.accumulate(best - idcs) + idcs
+    path = []
+    i = n
+    j = m
+    while i > 0 and j > 0:
+        if chars1[i - 1] == chars2[j - 1] and mat[i, j] == mat[i - 1, j - 1]:
+            path.append("k")
+            i -= 1
+            j -= 1
+        elif mat[i, j] == mat[i - 1, j] + 1:
+            path.append("d")
+            i -= 1
+        else:
+            path.append("i")
+            j -= 1
+    path.extend(["d"] * i)
+    path.extend(["i"] * j)
+    path.reverse()
+    return np.array(path, dtype="U1")
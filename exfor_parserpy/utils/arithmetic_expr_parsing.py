@@ -18,33 +18,39 @@ def get_next_char(expr, ofs):
         return expr[ofs], ofs
 
 
-def parse_symbol(expr, ofs, parse_usersym):
+def parse_operand(expr, ofs, parse_usersym):
     next_char, ofs = get_next_char(expr, ofs)
-    leftnode = {}
+    node = {}
     if next_char == "-":
-        leftnode["type"] = "neg"
-        childnode, ofs = parse_symbol(expr, ofs + 1, parse_usersym)
-        leftnode["children"] = [childnode]
+        node["type"] = "neg"
+        childnode, ofs = parse_operand(expr, ofs + 1, parse_usersym)
+        node["children"] = [childnode]
     elif next_char == "(":
-        leftnode["type"] = "bracket"
+        node["type"] = "bracket"
         childnode, ofs = parse_addition(expr, ofs + 1, parse_usersym)
-        leftnode["children"] = [childnode]
+        node["children"] = [childnode]
         next_char, ofs = get_next_char(expr, ofs)
         if next_char != ")":
             raise ValueError("bracket not closed")
         ofs += 1
     else:
-        leftnode, ofs = parse_usersym(expr, ofs)
-    # division needs to be treated specially
+        node, ofs = parse_usersym(expr, ofs)
+    return node, ofs
+
+
+def parse_symbol(expr, ofs, parse_usersym):
+    leftnode, ofs = parse_operand(expr, ofs, parse_usersym)
+    # division needs to be treated specially and
+    # chained divisions are evaluated from left to right
     next_char, ofs = get_next_char(expr, ofs)
-    if next_char == "/":
-        rightnode, ofs = parse_symbol(expr, ofs + 1, parse_usersym)
+    while next_char == "/":
+        rightnode, ofs = parse_operand(expr, ofs + 1, parse_usersym)
         divnode = {}
         divnode["type"] = "div"
         divnode["children"] = [leftnode, rightnode]
-        return divnode, ofs
-    else:
-        return leftnode, ofs
+        leftnode = divnode
+        next_char, ofs = get_next_char(expr, ofs)
+    return leftnode, ofs
 
 
 def parse_product(expr, ofs, parse_usersym):
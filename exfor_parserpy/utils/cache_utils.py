@@ -0,0 +1,94 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+import hashlib
+import json
+import os
+import pickle
+from .file_index import get_source_info
+
+
+CACHE_VERSION = 1
+
+
+def compute_content_hash(filename, chunksize=1 << 20):
+    h = hashlib.blake2b(digest_size=20)
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunksize), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_cache_key(filename, parse_opts=None):
+    # a profiler does not affect the result of the parse
+    if parse_opts is not None:
+        parse_opts = {k: v for k, v in parse_opts.items() if k != "profile"}
+    keyinfo = {
+        "version": CACHE_VERSION,
+        "path": os.path.abspath(filename),
+        "parse_opts": parse_opts,
+    }
+    keystr = json.dumps(keyinfo, sort_keys=True, default=str)
+    return hashlib.blake2b(keystr.encode(), digest_size=20).hexdigest()
+
+
+def get_cache_filenames(filename, cache_dir, parse_opts=None):
+    key = get_cache_key(filename, parse_opts)
+    basename = os.path.join(cache_dir, key)
+    return basename + ".json", basename + ".pkl"
+
+
+def write_atomically(filename, writefun, mode="wb"):
+    tmpfile = filename + f".tmp{os.getpid()}"
+    with open(tmpfile, mode) as f:
+        writefun(f)
+    os.replace(tmpfile, filename)
+
+
+def load_cached(filename, cache_dir, parse_opts=None):
+    """Return the cached parse result or None if it is outdated.
+
+    The cache is valid if size and modification time of the
+    file are unchanged or, if they differ, the content hash
+    is still the same. As the cache is stored with pickle,
+    the cache directory must only be writable by trusted users."""
+    meta_file, data_file = get_cache_filenames(filename, cache_dir, parse_opts)
+    if not os.path.exists(meta_file) or not os.path.exists(data_file):
+        return None
+    try:
+        with open(meta_file, "r") as f:
+            meta = json.load(f)
+    except ValueError:
+        return None
+    source_info = get_source_info(filename)
+    if meta["source"] != source_info:
+        if meta["hash"] != compute_content_hash(filename):
+            return None
+        # the file was touched but the content is the same
+        meta["source"] = source_info
+        write_atomically(meta_file, lambda f: json.dump(meta, f), mode="w")
+    with open(data_file, "rb") as f:
+        return pickle.load(f)
+
+
+def store_cached(filename, cache_dir, data, parse_opts=None):
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_file, data_file = get_cache_filenames(filename, cache_dir, parse_opts)
+    meta = {
+        "path": os.path.abspath(filename),
+        "source": get_source_info(filename),
+        "hash": compute_content_hash(filename),
+    }
+
+    def dump_data(f):
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    write_atomically(data_file, dump_data)
+    write_atomically(meta_file, lambda f: json.dump(meta, f), mode="w")
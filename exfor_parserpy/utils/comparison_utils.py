@@ -1,3 +1,11 @@
+import numpy as np
+
+
+def is_blank_value(x):
+    # blank fields are None or NaN depending on the array backend
+    return x is None or (isinstance(x, float) and x != x)
+
+
 def compare_dictionaries(dic1, dic2, atol=1e-8, rtol=1e-8, info=True):
     def write_info(msg):
         if info:
@@ -7,6 +15,8 @@ def compare_dictionaries(dic1, dic2, atol=1e-8, rtol=1e-8, info=True):
         write_info("different number of keys")
         return False
     for k in dic1.keys():
+        if is_blank_value(dic1[k]) and is_blank_value(dic2[k]):
+            continue
         if isinstance(dic1[k], dict) and isinstance(dic2[k], dict):
             if not compare_dictionaries(dic1[k], dic2[k], atol, rtol, info):
                 return False
@@ -14,12 +24,35 @@ def compare_dictionaries(dic1, dic2, atol=1e-8, rtol=1e-8, info=True):
             if not abs(dic1[k] - dic2[k]) <= (atol + rtol * abs(dic2[k])):
                 write_info(f"number mismatch for {k}")
                 return False
+        elif isinstance(dic1[k], np.ndarray) or isinstance(dic2[k], np.ndarray):
+            arr1 = np.array(dic1[k], dtype=float)
+            arr2 = np.array(dic2[k], dtype=float)
+            if arr1.shape != arr2.shape:
+                write_info(f"length mismatch for {k}")
+                return False
+            isnan1 = np.isnan(arr1)
+            isnan2 = np.isnan(arr2)
+            if np.any(isnan1 != isnan2):
+                write_info(f"None versus non-None for {k}")
+                return False
+            x = arr1[~isnan1]
+            y = arr2[~isnan2]
+            if np.any(np.abs(x - y) > (atol + rtol * np.abs(y))):
+                write_info(f"number mismatch of element in array {k}")
+                return False
         elif isinstance(dic1[k], list) and isinstance(dic2[k], list):
             if len(dic1[k]) != len(dic2[k]):
                 write_info(f"length mismatch for {k}")
                 return False
             for x, y in zip(dic1[k], dic2[k]):
-                if x is not None and y is not None:
+                if isinstance(x, dict) and isinstance(y, dict):
+                    if not compare_dictionaries(x, y, atol, rtol, info):
+                        return False
+                elif isinstance(x, str) or isinstance(y, str):
+                    if x != y:
+                        write_info(f"difference of element in list {k}")
+                        return False
+                elif x is not None and y is not None:
                     if abs(x - y) > (atol + rtol * abs(y)):
                         write_info(
                             f"number mismatch of element in list {k} ({x} vs {y})"
@@ -32,3 +65,33 @@ def compare_dictionaries(dic1, dic2, atol=1e-8, rtol=1e-8, info=True):
             write_info(f"difference for {k}")
             return False
     return True
+
+
+def is_same_content(obj1, obj2):
+    """Check if two values are equal without tolerance.
+
+    Blank values count as equal whether they are None or NaN,
+    and arrays are compared with lists element by element.
+    """
+    if isinstance(obj1, dict) and isinstance(obj2, dict):
+        if obj1.keys() != obj2.keys():
+            return False
+        return all(is_same_content(obj1[k], obj2[k]) for k in obj1)
+    elif isinstance(obj1, dict) or isinstance(obj2, dict):
+        return False
+    elif isinstance(obj1, np.ndarray) or isinstance(obj2, np.ndarray):
+        arr1 = np.asarray(obj1, dtype=float)
+        arr2 = np.asarray(obj2, dtype=float)
+        return arr1.shape == arr2.shape and np.array_equal(arr1, arr2, equal_nan=True)
+    elif isinstance(obj1, list) and isinstance(obj2, list):
+        # the elementwise comparison is only needed for NaN
+        if obj1 == obj2:
+            return True
+        if len(obj1) != len(obj2):
+            return False
+        return all(is_same_content(x, y) for x, y in zip(obj1, obj2))
+    elif isinstance(obj1, list) or isinstance(obj2, list):
+        return False
+    elif is_blank_value(obj1) and is_blank_value(obj2):
+        return True
+    return obj1 == obj2
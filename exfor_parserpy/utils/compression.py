@@ -0,0 +1,82 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+import bz2
+import gzip
+import io
+import lzma
+import tarfile
+import zipfile
+
+
+MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zip": b"PK\x03\x04",
+}
+
+OPENERS = {None: open, "gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+def is_tar_header(block):
+    return len(block) >= 262 and block[257:262] == b"ustar"
+
+
+def detect_compression(filename):
+    """Determine the compression of a file from its magic bytes.
+
+    Returns None for uncompressed files, one of gzip, bz2, xz
+    and zip, or tar for (possibly compressed) tar archives.
+    """
+    with open(filename, "rb") as f:
+        head = f.read(8)
+    compression = None
+    for name, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            compression = name
+    if compression == "zip":
+        return compression
+    with OPENERS[compression](filename, "rb") as f:
+        block = f.read(512)
+    return "tar" if is_tar_header(block) else compression
+
+
+def is_compressed(filename):
+    return detect_compression(filename) is not None
+
+
+def iter_text_streams(filename):
+    """Yield (name, text stream) tuples of the files in a file or archive.
+
+    Compressed files are decompressed on the fly and the members
+    of zip and tar archives are visited in the order of the archive.
+    A stream is only valid until the next tuple is requested.
+    """
+    compression = detect_compression(filename)
+    if compression == "zip":
+        with zipfile.ZipFile(filename) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                with zf.open(info) as f:
+                    yield info.filename, io.TextIOWrapper(f)
+    elif compression == "tar":
+        # the members are read in the order of the archive so
+        # compressed archives are decompressed in one forward pass
+        with tarfile.open(filename, "r:*") as tf:
+            for member in tf:
+                if not member.isfile():
+                    continue
+                with tf.extractfile(member) as f:
+                    yield member.name, io.TextIOWrapper(f)
+    else:
+        with OPENERS[compression](filename, "rt") as f:
+            yield str(filename), f
@@ -8,10 +8,19 @@
 # Copyright (c) 2022 International Atomic Energy Agency (IAEA)
 #
 ############################################################
+import numpy as np
+
+
+def get_parse_opt(parse_opts, key, default=None):
+    if parse_opts is None:
+        return default
+    return parse_opts.get(key, default)
 
 
 def apply_factor(data, fact):
-    if isinstance(data, list):
+    if is_array(data):
+        newdata = data * fact
+    elif isinstance(data, list):
         newdata = [d * fact if d is not None else None for d in data]
     else:
         d = data
@@ -27,6 +36,10 @@ def is_list(obj):
     return isinstance(obj, list)
 
 
+def is_array(obj):
+    return isinstance(obj, np.ndarray)
+
+
 def is_str(obj):
     return isinstance(obj, str)
 
@@ -170,18 +183,33 @@ def count_points_in_datablock(datablock):
     return length
 
 
+def uses_array_backend(datablock):
+    for arr in datablock["DATA"].values():
+        if is_dic(arr):
+            return any(is_array(arr2) for arr2 in arr.values())
+        return is_array(arr)
+    return False
+
+
+def repeat_value(val, numpoints, as_array=False):
+    if as_array:
+        return np.full(numpoints, val if val is not None else np.nan, np.float64)
+    return [val for i in range(numpoints)]
+
+
 def merge_common_into_datablock(datablock, commonblock):
     numpoints = count_points_in_datablock(datablock)
+    as_array = uses_array_backend(datablock)
     for curkey, curitem in commonblock["UNIT"].items():
         datablock["UNIT"][curkey] = curitem
     for curkey, curval in commonblock["DATA"].items():
         if not contains_pointers(curval):
-            datablock["DATA"][curkey] = [curval for i in range(numpoints)]
+            datablock["DATA"][curkey] = repeat_value(curval, numpoints, as_array)
         else:
             curdic = {}
             for curpt in curval:
                 curval2 = curval[curpt]
-                curdic[curpt] = [curval2 for i in range(numpoints)]
+                curdic[curpt] = repeat_value(curval2, numpoints, as_array)
             datablock["DATA"][curkey] = curdic
 
 
@@ -0,0 +1,51 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from copy import deepcopy
+from .convenience import is_dic, is_subentry
+from .custom_iterators import exfor_iterator3
+from .profiling import profiled
+
+
+def copy_above_subentries(dic):
+    """Copy the dictionaries above the subentries.
+
+    The subentries themselves are shared with the original."""
+    if not is_dic(dic) or is_subentry(dic):
+        return dic
+    return {key: copy_above_subentries(item) for key, item in dic.items()}
+
+
+def detach_subentries(exfor_dic, modifies):
+    """Replace shared subentries to be modified by copies."""
+    outeriter = tuple(exfor_iterator3(exfor_dic, filterfun=is_subentry))
+    for subentid, subent, parent_of_subent in outeriter:
+        if parent_of_subent is None or not is_subentry(subent, subentid):
+            continue
+        if modifies(subent):
+            parent_of_subent[subentid] = deepcopy(subent)
+
+
+@profiled("copy")
+def copy_for_trafo(exfor_dic, inplace=False, share_unmodified=False, modifies=None):
+    """Prepare the dictionary a transformer is going to modify.
+
+    If inplace is True, the dictionary is returned as is.
+    If share_unmodified is True, only the subentries for which
+    the function modifies returns True are copied and all other
+    subentries are shared between original and returned dictionary.
+    Otherwise a deep copy is returned."""
+    if inplace:
+        return exfor_dic
+    if not share_unmodified or modifies is None or is_subentry(exfor_dic):
+        return deepcopy(exfor_dic)
+    ret_dic = copy_above_subentries(exfor_dic)
+    detach_subentries(ret_dic, modifies)
+    return ret_dic
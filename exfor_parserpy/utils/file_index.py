@@ -0,0 +1,180 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+import json
+import mmap
+import re
+from os import fstat, stat
+from os.path import exists
+
+
+INDEX_VERSION = 2
+
+# start of the records delimiting entries and subentries,
+# the match is only a candidate because the keyword must
+# also fill the first 11 characters of the line on its own
+RECORD_REGEX = re.compile(rb"^(?:ENDENTRY|ENDSUBENT|ENTRY|SUBENT)\b", re.MULTILINE)
+SECTION_REGEX = re.compile(
+    rb"^(?:NOBIB|NOCOMMON|NODATA|BIB|COMMON|DATA)\b", re.MULTILINE
+)
+
+
+def get_index_filename(filename):
+    return str(filename) + ".idx"
+
+
+def get_source_info(filename):
+    st = stat(filename)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def open_mmap(f):
+    """Map a file opened in binary mode read-only into memory."""
+    # empty files cannot be mapped but behave like empty bytes
+    if fstat(f.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_records(buf):
+    """Yield (keyword, id, start, end) of the delimiting records in a buffer."""
+    for m in RECORD_REGEX.finditer(buf):
+        start = m.start()
+        end = buf.find(b"\n", start)
+        end = len(buf) if end == -1 else end + 1
+        keyword = buf[start : min(start + 11, end)].rstrip()
+        if keyword != m.group():
+            continue
+        recid = buf[start + 11 : min(start + 22, end)].decode().strip()
+        yield keyword, recid, start, end
+
+
+def build_index(filename):
+    """Map entry and subentry ids to byte offsets and lengths."""
+    # entries map to [offset, length] and
+    # subentries to [entryid, offset, length]
+    with open(filename, "rb") as f:
+        buf = open_mmap(f)
+        try:
+            entries, subentries = index_buffer(buf)
+        finally:
+            if hasattr(buf, "close"):
+                buf.close()
+    return {
+        "version": INDEX_VERSION,
+        "source": get_source_info(filename),
+        "entries": entries,
+        "subentries": subentries,
+    }
+
+
+def index_buffer(buf):
+    entries = {}
+    subentries = {}
+    curentry = None
+    cursubent = None
+    for keyword, recid, start, end in iter_records(buf):
+        if keyword == b"ENTRY":
+            entryid = recid
+            curentry = [start, start]
+            entries[entryid] = curentry
+        elif keyword == b"SUBENT" and curentry is not None:
+            cursubent = [entryid, start, start]
+            subentries[recid] = cursubent
+        elif keyword == b"ENDSUBENT" and cursubent is not None:
+            cursubent[2] = end - cursubent[1]
+            cursubent = None
+        elif keyword == b"ENDENTRY" and curentry is not None:
+            curentry[1] = end - curentry[0]
+            curentry = None
+    # unterminated blocks extend to the end of the buffer
+    if curentry is not None:
+        curentry[1] = len(buf) - curentry[0]
+    if cursubent is not None:
+        cursubent[2] = len(buf) - cursubent[1]
+    return entries, subentries
+
+
+def write_index(index, index_filename):
+    with open(index_filename, "w") as f:
+        json.dump(index, f)
+
+
+def read_index(index_filename):
+    with open(index_filename, "r") as f:
+        return json.load(f)
+
+
+def is_index_valid(index, filename):
+    if index.get("version") != INDEX_VERSION:
+        return False
+    return index.get("source") == get_source_info(filename)
+
+
+def load_index(filename, index_filename=None, persist=True):
+    """Read the side-car index of a file and rebuild it if outdated."""
+    if index_filename is None:
+        index_filename = get_index_filename(filename)
+    if exists(index_filename):
+        try:
+            index = read_index(index_filename)
+        except ValueError:
+            index = None
+        if index is not None and is_index_valid(index, filename):
+            return index
+    index = build_index(filename)
+    if persist:
+        try:
+            write_index(index, index_filename)
+        except OSError:
+            # the index is a pure speed-up so failing
+            # to store it, e.g., in a read-only
+            # directory, must not break reading
+            pass
+    return index
+
+
+def read_block_lines(buf, offset, length):
+    """Decode the lines of a block in a buffer, e.g., a memory map."""
+    block = buf[offset : offset + length].decode()
+    lines = block.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return [line.rstrip("\r") for line in lines]
+
+
+def locate_sections(buf, start, end):
+    """Map the sections of a subentry in a buffer to their byte ranges."""
+    # we jump from section to section so that the headings
+    # in COMMON and DATA, which may be named DATA, are never
+    # mistaken for the start of a section
+    sections = {}
+    pos = start
+    while True:
+        m = SECTION_REGEX.search(buf, pos, end)
+        if m is None:
+            break
+        secstart = m.start()
+        lineend = buf.find(b"\n", secstart, end)
+        lineend = end if lineend == -1 else lineend + 1
+        keyword = buf[secstart : min(secstart + 11, lineend)].rstrip()
+        if keyword != m.group() or keyword.startswith(b"NO"):
+            pos = lineend
+            continue
+        endregex = re.compile(rb"^END" + keyword + rb"\b", re.MULTILINE)
+        endm = endregex.search(buf, lineend, end)
+        if endm is None:
+            secend = end
+        else:
+            secend = buf.find(b"\n", endm.start(), end)
+            secend = end if secend == -1 else secend + 1
+        sections[keyword.decode()] = (secstart, secend)
+        pos = secend
+    return sections
@@ -0,0 +1,95 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+import hashlib
+import struct
+import numpy as np
+
+
+# part of every hash so that stored fingerprints
+# can be invalidated if the serialization changes
+FINGERPRINT_VERSION = b"exfor-fingerprint-1"
+
+
+FLOAT_LIST_TYPES = {float, type(None)}
+
+
+def is_float_list(obj):
+    return len(obj) > 0 and set(map(type, obj)) <= FLOAT_LIST_TYPES
+
+
+def update_hash(h, obj):
+    # every item is prefixed by a type tag and strings and
+    # containers by their length so that the serialization
+    # is unambiguous
+    if obj is None:
+        h.update(b"n")
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        h.update(b"s" + struct.pack("<q", len(data)) + data)
+    elif isinstance(obj, bool):
+        h.update(b"b" + struct.pack("<?", obj))
+    elif isinstance(obj, int):
+        data = str(obj).encode("ascii")
+        h.update(b"i" + struct.pack("<q", len(data)) + data)
+    elif isinstance(obj, float):
+        h.update(b"f" + struct.pack("<d", obj))
+    elif isinstance(obj, dict):
+        h.update(b"d" + struct.pack("<q", len(obj)))
+        for key, value in obj.items():
+            update_hash(h, key)
+            update_hash(h, value)
+    elif isinstance(obj, (list, tuple)) and is_float_list(obj):
+        # the columns of the list backend are packed in one go
+        values = np.array(obj, dtype="<f8")
+        if None in obj:
+            mask = bytes(v is None for v in obj)
+        else:
+            mask = bytes(len(obj))
+        h.update(b"L" + struct.pack("<q", len(obj)) + mask + values.tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"l" + struct.pack("<q", len(obj)))
+        for value in obj:
+            update_hash(h, value)
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        arr = arr.astype(arr.dtype.newbyteorder("<"), copy=False)
+        update_hash(h, arr.dtype.str)
+        update_hash(h, list(arr.shape))
+        if arr.dtype.hasobject:
+            update_hash(h, arr.ravel().tolist())
+        else:
+            data = arr.tobytes()
+            h.update(b"a" + struct.pack("<q", len(data)) + data)
+    elif isinstance(obj, np.generic):
+        update_hash(h, obj.item())
+    else:
+        raise TypeError(f"cannot fingerprint an object of type {type(obj)}")
+
+
+def fingerprint_subentry(subent):
+    """Return a content hash of a subentry.
+
+    The hash is computed from a serialization of the keys
+    and values that only depends on the content and the
+    order of the keys, which is the order in the file, and
+    not on the versions of Python and NumPy.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(FINGERPRINT_VERSION)
+    update_hash(h, subent)
+    return h.hexdigest()
+
+
+def fingerprint_entry(entry):
+    """Return a dictionary with the content hashes of the subentries."""
+    return {
+        subentid: fingerprint_subentry(subent) for subentid, subent in entry.items()
+    }
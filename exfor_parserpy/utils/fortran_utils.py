@@ -7,6 +7,16 @@
 # License:      MIT
 #
 ############################################################
+import numpy as np
+
+
+# characters that may appear in a number field that can be
+# converted by fortstrs2floats, fields with other characters
+# must be dealt with by fortstr2float
+FORT_FLOAT_CHARS = np.zeros(256, dtype=bool)
+FORT_FLOAT_CHARS[[ord(c) for c in "0123456789.+-Ee "]] = True
+
+
 def fortstr2float(valstr, blank=None):
     valstr = valstr.replace(" ", "")
     for i, c in enumerate(valstr):
@@ -16,6 +26,61 @@ def fortstr2float(valstr, blank=None):
     return float(valstr)
 
 
+def fortstrs2floats(chars):
+    """Vectorized version of fortstr2float.
+
+    The argument is an (n, w) uint8 array with the characters
+    of n fields of width w. Returned are an array with the
+    n float values and a boolean array indicating blank fields,
+    which are associated with NaN in the value array."""
+    if not FORT_FLOAT_CHARS[chars].all():
+        raise ValueError("unexpected characters in number fields")
+    numfields, width = chars.shape
+    space = chars == ord(" ")
+    blank = space.all(axis=1)
+    # move all non-blank characters to the front of a field
+    # which is equivalent to the removal of blanks in fortstr2float
+    order = np.argsort(space, axis=1, kind="stable")
+    chars = np.take_along_axis(chars, order, axis=1)
+    chars = np.concatenate([chars, np.full((numfields, 1), ord(" "), np.uint8)], 1)
+    # locate the first sign preceded by a digit or period,
+    # which marks the start of an exponent missing the E
+    is_digit_or_dot = ((chars >= ord("0")) & (chars <= ord("9"))) | (chars == ord("."))
+    is_sign = (chars == ord("+")) | (chars == ord("-"))
+    is_exp_start = is_sign[:, 1:] & is_digit_or_dot[:, :-1]
+    has_exp_start = is_exp_start.any(axis=1)
+    exp_pos = np.where(has_exp_start, is_exp_start.argmax(axis=1) + 1, width + 1)
+    # shift the exponent by one character to insert the E
+    idx = np.arange(width + 1)
+    src = np.where(idx < exp_pos[:, None], idx, idx - 1)
+    chars = np.take_along_axis(chars, src, axis=1)
+    chars[idx == exp_pos[:, None]] = ord("E")
+    # blanks are replaced by null characters so that they are
+    # ignored in the conversion of the byte strings
+    chars[chars == ord(" ")] = 0
+    chars[blank, 0] = ord("0")
+    strs = np.ascontiguousarray(chars).view(f"S{width + 1}")[:, 0]
+    values = strs.astype(np.float64)
+    values[blank] = np.nan
+    return values, blank
+
+
+def read_fort_float_table(lines, numfields, n=6, w=11):
+    """Read a table with numfields values per record,
+    each record possibly spanning several lines."""
+    linewidth = n * w
+    lines_per_record = (numfields + n - 1) // n
+    try:
+        buf = "".join(line[:linewidth].ljust(linewidth) for line in lines)
+        buf = buf.encode("latin-1")
+    except UnicodeEncodeError:
+        raise ValueError("unexpected characters in number fields")
+    chars = np.frombuffer(buf, dtype=np.uint8)
+    chars = chars.reshape(-1, lines_per_record * n, w)[:, :numfields, :]
+    values, blank = fortstrs2floats(chars.reshape(-1, w))
+    return values.reshape(-1, numfields), blank.reshape(-1, numfields)
+
+
 def float2fortstr(val, width=11):
     av = abs(val)
     if av >= 1e-9 and av < 1e10:
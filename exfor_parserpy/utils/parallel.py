@@ -0,0 +1,31 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def ordered_parallel_map(fun, iterable, workers, max_pending=None):
+    """Apply fun to the items in a pool of worker processes.
+
+    In contrast to Executor.map, the items are only consumed
+    as results are requested so that at most max_pending items
+    are in flight, which keeps memory bounded when streaming.
+    The results are yielded in the order of the items."""
+    if max_pending is None:
+        max_pending = 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in iterable:
+            pending.append(executor.submit(fun, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while len(pending) > 0:
+            yield pending.popleft().result()
@@ -0,0 +1,185 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from functools import wraps
+import heapq
+import json
+import time
+
+
+# profilers activated by a with statement
+ACTIVE_PROFILERS = []
+
+
+class Profiler:
+    """Collect timings and counts of the stages of parsing and transforming.
+
+    A profiler is activated either by a with statement, which
+    covers the parser and the transformers, or by passing it as
+    parse_opts={"profile": profiler} to the parsing functions.
+    For each stage, the wall time, the number of calls and the
+    lines, bytes and entries processed are recorded, and for
+    stages associated with an entry also the slowest entries.
+    Only work done in the current process is recorded, i.e.,
+    not the work of worker processes.
+    """
+
+    def __init__(self, num_slowest=10):
+        self.num_slowest = num_slowest
+        self.stages = {}
+        self.slowest = {}
+
+    def __enter__(self):
+        ACTIVE_PROFILERS.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ACTIVE_PROFILERS.remove(self)
+
+    def stage(self, name, entryid=None):
+        return ProfiledStage(self, name, entryid)
+
+    def add(self, name, elapsed, calls=1, lines=0, nbytes=0, entries=0):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = {"calls": 0, "time": 0.0, "lines": 0, "bytes": 0, "entries": 0}
+            self.stages[name] = stats
+        stats["calls"] += calls
+        stats["time"] += elapsed
+        stats["lines"] += lines
+        stats["bytes"] += nbytes
+        stats["entries"] += entries
+
+    def add_entry(self, name, entryid, elapsed):
+        # a min-heap keeps the slowest entries seen so far
+        heap = self.slowest.setdefault(name, [])
+        item = (elapsed, entryid)
+        if len(heap) < self.num_slowest:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def slowest_entries(self, name):
+        heap = self.slowest.get(name, [])
+        return [
+            {"entry": entryid, "time": elapsed}
+            for elapsed, entryid in sorted(heap, reverse=True)
+        ]
+
+    def to_dict(self):
+        stages = {}
+        for name, stats in self.stages.items():
+            stages[name] = stats.copy()
+            if stats["time"] > 0:
+                stages[name]["mb_per_sec"] = stats["bytes"] / stats["time"] / 1e6
+                stages[name]["entries_per_sec"] = stats["entries"] / stats["time"]
+        slowest = {name: self.slowest_entries(name) for name in self.slowest}
+        return {"stages": stages, "slowest_entries": slowest}
+
+    def to_json(self, filename=None, indent=2):
+        jsonstr = json.dumps(self.to_dict(), indent=indent)
+        if filename is not None:
+            with open(filename, "w") as f:
+                f.write(jsonstr)
+        return jsonstr
+
+
+class ProfiledStage:
+    active = True
+
+    def __init__(self, profiler, name, entryid=None):
+        self.profiler = profiler
+        self.name = name
+        self.entryid = entryid
+        self.lines = 0
+        self.nbytes = 0
+        self.entries = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start
+        self.profiler.add(self.name, elapsed, 1, self.lines, self.nbytes, self.entries)
+        if self.entryid is not None:
+            self.profiler.add_entry(self.name, self.entryid, elapsed)
+
+    def count(self, lines=0, nbytes=0, entries=0):
+        self.lines += lines
+        self.nbytes += nbytes
+        self.entries += entries
+
+
+class NullStage:
+    """Stand-in for a stage if no profiler is active."""
+
+    active = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def count(self, lines=0, nbytes=0, entries=0):
+        pass
+
+
+NULL_STAGE = NullStage()
+
+
+def get_profiler(parse_opts=None):
+    """Return the profiler given in parse_opts or activated by with.
+
+    If parse_opts["profile"] is True, a new Profiler is created
+    and stored in parse_opts["profile"] so that the caller can
+    retrieve it after parsing.
+    """
+    profiler = None if parse_opts is None else parse_opts.get("profile")
+    if profiler is True:
+        profiler = Profiler()
+        parse_opts["profile"] = profiler
+    elif profiler is False:
+        profiler = None
+    elif profiler is not None and not isinstance(profiler, Profiler):
+        raise TypeError(
+            "parse_opts['profile'] must be True, False or a Profiler, "
+            + f"not {type(profiler).__name__}"
+        )
+    if profiler is not None:
+        return profiler
+    return ACTIVE_PROFILERS[-1] if len(ACTIVE_PROFILERS) > 0 else None
+
+
+def profile_stage(name, entryid=None, parse_opts=None):
+    """Time a stage if a profiler is active."""
+    profiler = get_profiler(parse_opts)
+    if profiler is None:
+        return NULL_STAGE
+    return profiler.stage(name, entryid)
+
+
+def profiled(name):
+    """Decorator to time each call of a function as stage."""
+
+    def decorator(fun):
+        @wraps(fun)
+        def wrapper(*args, **kwargs):
+            with profile_stage(name):
+                return fun(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count_bytes(lines):
+    return sum(len(line) for line in lines) + len(lines)
@@ -0,0 +1,210 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+import numpy as np
+from ..exfor_parser import ExforWriter
+
+
+REACTIONS = (
+    "(26-FE-56(N,TOT),,SIG)",
+    "(79-AU-197(N,G)79-AU-198,,SIG)",
+    "(92-U-235(N,F),,SIG)",
+    "(8-O-16(N,EL)8-O-16,,DA)",
+)
+
+WORDS = (
+    "NEUTRON",
+    "CROSS",
+    "SECTION",
+    "MEASUREMENT",
+    "TIME-OF-FLIGHT",
+    "SAMPLE",
+    "DETECTOR",
+    "CORRECTED",
+    "FOR",
+    "DEAD-TIME",
+    "AND",
+    "BACKGROUND",
+    "RESOLUTION",
+    "ENERGY",
+)
+
+
+def generate_entry(
+    entrynum,
+    num_subents=2,
+    num_cols=3,
+    num_rows=10,
+    num_common=1,
+    bib_lines=2,
+    num_pointers=0,
+    num_multifields=0,
+    blank_fraction=0.0,
+    seed=0,
+):
+    """Generate a synthetic EXFOR entry as nested dictionary.
+
+    The entry contains a first subentry with general information
+    and num_subents subentries with DATA tables. Each table has
+    the columns EN, DATA and DATA-ERR, the latter two repeated
+    for num_pointers pointers if this number is positive, then
+    num_multifields FLAG columns, and as many MISC columns as
+    needed to reach num_cols. The numbers have five significant
+    digits so that the entry survives the conversion to EXFOR
+    and back unchanged. The same arguments always lead to the
+    same entry, independent of other entries generated.
+    """
+    if num_subents > 998:
+        raise ValueError("an entry can have at most 998 data subentries")
+    rng = np.random.default_rng([seed, entrynum])
+    entryid = f"{entrynum:05d}"
+    entry = {}
+    subentid = entryid + "001"
+    entry[subentid] = {
+        "__entryid": entryid,
+        "__subentid": subentid,
+        "BIB": {
+            "TITLE": generate_text(rng, bib_lines),
+            "AUTHOR": "(A.AUTHOR,B.AUTHOR)",
+            "INSTITUTE": "(3ZZZIAE)",
+            "REFERENCE": f"(J,XX,{entrynum % 100},{entrynum % 1000},2026)",
+        },
+        "COMMON": generate_common(rng, num_common),
+    }
+    pointers = [str(i + 1) for i in range(num_pointers)]
+    for i in range(num_subents):
+        subentid = entryid + f"{i + 2:03d}"
+        if len(pointers) > 0:
+            reaction = {p: REACTIONS[rng.integers(len(REACTIONS))] for p in pointers}
+        else:
+            reaction = REACTIONS[rng.integers(len(REACTIONS))]
+        entry[subentid] = {
+            "__entryid": entryid,
+            "__subentid": subentid,
+            "BIB": {
+                "REACTION": reaction,
+                "STATUS": generate_text(rng, bib_lines, prefix="(TABLE)"),
+            },
+            "COMMON": generate_common(rng, num_common),
+            "DATA": generate_data(
+                rng, num_cols, num_rows, pointers, num_multifields, blank_fraction
+            ),
+        }
+    return entryid, entry
+
+
+def generate_text(rng, num_lines, prefix=""):
+    # the lines are kept within the 55 characters available
+    # for the content of a BIB field, which cannot be empty
+    lines = []
+    for _ in range(max(1, num_lines)):
+        line = prefix
+        prefix = ""
+        for word in rng.choice(WORDS, size=rng.integers(3, 7)):
+            if len(line) + len(word) + 1 > 55:
+                break
+            line = line + " " + word if line else word
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def generate_common(rng, num_common):
+    units = {}
+    values = {}
+    for i in range(num_common):
+        key = "ANG" if i == 0 else f"MISC-C{i}"
+        units[key] = "ADEG" if i == 0 else "NO-DIM"
+        values[key] = round_value(rng.uniform(0.0, 180.0))
+    return {"UNIT": units, "DATA": values}
+
+
+def generate_data(rng, num_cols, num_rows, pointers, num_multifields, blank_fraction):
+    units = {"EN": "KEV"}
+    data = {"EN": round_column(np.sort(rng.uniform(1e-3, 2e4, num_rows)))}
+    for key, unit in (("DATA", "B"), ("DATA-ERR", "B")):
+        units[key], data[key] = generate_column(
+            rng, unit, num_rows, pointers, blank_fraction
+        )
+    if num_multifields > 0:
+        # duplicate fields are told apart by an index
+        # appended to the pointer as done by the parser
+        multi = [" " + str(i) for i in range(num_multifields)]
+        if num_multifields == 1:
+            multi = []
+        units["FLAG"], data["FLAG"] = generate_column(
+            rng, "NO-DIM", num_rows, multi, blank_fraction
+        )
+    numfields = len(pointers) * 2 if len(pointers) > 0 else 2
+    numfields += 1 + num_multifields
+    for k in range(num_cols - numfields):
+        key = f"MISC{k + 1}"
+        units[key], data[key] = generate_column(
+            rng, "NO-DIM", num_rows, [], blank_fraction
+        )
+    return {"UNIT": units, "DATA": data}
+
+
+def generate_column(rng, unit, num_rows, pointers, blank_fraction):
+    if len(pointers) == 0:
+        return unit, generate_values(rng, num_rows, blank_fraction)
+    units = {p: unit for p in pointers}
+    values = {p: generate_values(rng, num_rows, blank_fraction) for p in pointers}
+    return units, values
+
+
+def generate_values(rng, num_rows, blank_fraction):
+    values = round_column(rng.lognormal(0.0, 2.0, num_rows))
+    if blank_fraction > 0:
+        for i in np.flatnonzero(rng.random(num_rows) < blank_fraction):
+            values[i] = None
+    return values
+
+
+def round_value(value):
+    return float(f"{value:.5g}")
+
+
+def round_column(values):
+    return [float(f"{value:.5g}") for value in values]
+
+
+def iter_synthetic_exfor(num_entries=10, first_entrynum=10000, seed=0, **kwargs):
+    """Yield (entryid, entry) tuples of synthetic entries.
+
+    The keyword arguments are passed on to generate_entry.
+    """
+    if first_entrynum + num_entries > 100000:
+        raise ValueError("entry numbers must have at most five digits")
+    for entrynum in range(first_entrynum, first_entrynum + num_entries):
+        yield generate_entry(entrynum, seed=seed, **kwargs)
+
+
+def generate_exfor(num_entries=10, first_entrynum=10000, seed=0, **kwargs):
+    """Generate a dictionary with synthetic entries."""
+    return dict(iter_synthetic_exfor(num_entries, first_entrynum, seed, **kwargs))
+
+
+def write_synthetic_exfor(
+    filename,
+    num_entries=10,
+    first_entrynum=10000,
+    seed=0,
+    overwrite=False,
+    compress=None,
+    **kwargs,
+):
+    """Write synthetic entries one by one to an EXFOR file.
+
+    As only one entry is held in memory at any time, this
+    function can also produce files of several gigabytes.
+    """
+    entries = iter_synthetic_exfor(num_entries, first_entrynum, seed, **kwargs)
+    with ExforWriter(filename, overwrite=overwrite, compress=compress) as writer:
+        writer.write_entries(entries)
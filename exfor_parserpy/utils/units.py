@@ -0,0 +1,286 @@
+############################################################
+#
+# Author(s):       Georg Schnabel
+# Email:           g.schnabel@iaea.org
+# Creation date:   2026/10/18
+# Last modified:   2026/10/18
+# License:         MIT
+# Copyright (c) 2026 International Atomic Energy Agency (IAEA)
+#
+############################################################
+from collections import OrderedDict
+from math import pi
+from .arithmetic_expr_parsing import (
+    reconstruct_expr_str,
+    eval_expr_tree,
+    parse_arithm_expr,
+)
+from .profiling import profile_stage
+
+
+# dimension of NO-DIM, PER-CENT and numbers such as the 1 in 1/KEV
+DIMENSIONLESS = "1"
+
+# number of unit expressions whose results are kept by a registry,
+# a library contains only a few hundred distinct expressions
+UNIT_CACHE_SIZE = 1024
+
+# code: (dimension, factor to convert to the reference unit)
+DEFAULT_UNITS = {
+    # energy, reference MEV
+    "MILLI-EV": ("E", 1e-9),
+    "EV": ("E", 1e-6),
+    "KEV": ("E", 1e-3),
+    "MEV": ("E", 1),
+    "GEV": ("E", 1e3),
+    "TEV": ("E", 1e6),
+    # cross section, reference MB
+    "NB": ("B", 1e-6),
+    "MICRO-B": ("B", 1e-3),
+    # same as MICRO-B but used
+    # in differential quantities
+    # due to field size limitation
+    "MU-B": ("B", 1e-3),
+    "MB": ("B", 1),
+    "B": ("B", 1e3),
+    "KB": ("B", 1e6),
+    # angle, reference ADEG
+    "ADEG": ("A", 1),
+    "ARAD": ("A", 180 / pi),
+    # solid angle
+    "SR": ("SR", 1),
+    # time, reference SEC
+    "PSEC": ("T", 1e-12),
+    "NSEC": ("T", 1e-9),
+    "USEC": ("T", 1e-6),
+    "MSEC": ("T", 1e-3),
+    "SEC": ("T", 1),
+    "MIN": ("T", 60),
+    "HR": ("T", 3600),
+    "D": ("T", 86400),
+    "YR": ("T", 31557600),
+    # length, reference CM
+    "FM": ("L", 1e-13),
+    "MM": ("L", 0.1),
+    "CM": ("L", 1),
+    # dimensionless quantities
+    "NO-DIM": (DIMENSIONLESS, 1),
+    "PER-CENT": (DIMENSIONLESS, 1e-2),
+}
+
+# dimension: unit all units of this dimension are converted to
+DEFAULT_TARGETS = {
+    "E": "MEV",
+    "B": "MB",
+    "A": "ADEG",
+    "SR": "SR",
+    "T": "SEC",
+    "L": "CM",
+    DIMENSIONLESS: "NO-DIM",
+}
+
+
+class UnitRegistry:
+    """Units with their dimension and conversion factor.
+
+    Each unit belongs to a dimension, e.g., E for energies, and
+    has a factor to convert it to the reference unit of this
+    dimension. A target unit can be set for each dimension to
+    which unitfy converts all units of this dimension. Compound
+    units, such as B/SR/KEV, are resolved from the units in the
+    registry and the results are cached, hence the registry
+    should only be changed by its methods. Unknown units are
+    left as they are.
+    """
+
+    def __init__(self, units=None, targets=None, cache_size=UNIT_CACHE_SIZE):
+        self.units = {}
+        self.targets = {}
+        self._compiled = LRUCache(cache_size)
+        self._dimensions = LRUCache(cache_size)
+        if units is not None:
+            for code, (dimension, factor) in units.items():
+                self.add_unit(code, dimension, factor)
+        if targets is not None:
+            for dimension, code in targets.items():
+                self.set_target(dimension, code)
+
+    def add_unit(self, code, dimension, factor):
+        self.units[code] = (dimension, float(factor))
+        self.clear_cache()
+
+    def set_target(self, dimension, code):
+        """Set the unit to convert units of a dimension to.
+
+        If code is None, units of this dimension are not converted.
+        """
+        if code is None:
+            self.targets.pop(dimension, None)
+        elif self.units.get(code, (None,))[0] != dimension:
+            raise ValueError(f"{code} is not a unit of dimension {dimension}")
+        else:
+            self.targets[dimension] = code
+        self.clear_cache()
+
+    def load(self, filename):
+        """Add the units listed in a text file.
+
+        Each line contains the unit code, its dimension and the
+        factor to convert to the reference unit of the dimension,
+        separated by whitespace, e.g., KEV E 1e-3. An asterisk
+        in a fourth column marks the target unit of the dimension.
+        Empty lines and lines starting with # are ignored.
+        """
+        with open(filename, "r") as f:
+            for linenum, line in enumerate(f, start=1):
+                fields = line.split()
+                if len(fields) == 0 or fields[0].startswith("#"):
+                    continue
+                if len(fields) < 3:
+                    raise ValueError(f"line {linenum} of {filename} has too few fields")
+                code, dimension, factor = fields[:3]
+                self.add_unit(code, dimension, float(factor))
+                if len(fields) > 3 and fields[3] == "*":
+                    self.set_target(dimension, code)
+        return self
+
+    def clear_cache(self):
+        self._compiled.clear()
+        self._dimensions.clear()
+
+    def convert_unit(self, code):
+        """Return the factor and the target unit of a single unit."""
+        if code not in self.units:
+            return 1, code
+        dimension, factor = self.units[code]
+        target = self.targets.get(dimension)
+        if target is None:
+            return 1, code
+        return factor / self.units[target][1], target
+
+    def compile(self, unit_expr_str):
+        """Return the factor and the unit to convert a unit expression to."""
+        result = self._compiled.get(unit_expr_str)
+        if result is None:
+            with profile_stage("unitfy.compile_unit"):
+                unit_tree = get_unit_tree(unit_expr_str)
+                result = (
+                    compute_conversion_factor(unit_tree, self),
+                    substitute_unit_str(unit_tree, self),
+                )
+            self._compiled.put(unit_expr_str, result)
+        return result
+
+    def dimension(self, unit_expr_str):
+        """Reduce a unit expression to a dictionary of dimensions and exponents.
+
+        For instance, B/SR/KEV leads to {"B": 1, "SR": -1, "E": -1}.
+        Unknown units are treated as dimensions of their own.
+        """
+        result = self._dimensions.get(unit_expr_str)
+        if result is None:
+            unit_tree = get_unit_tree(unit_expr_str)
+            result = reduce_dimension(unit_tree, self)
+            self._dimensions.put(unit_expr_str, result)
+        return result.copy()
+
+
+class LRUCache:
+    """Dictionary keeping only the most recently used items."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+def default_unit_registry():
+    """Create a registry with the default units and targets."""
+    return UnitRegistry(DEFAULT_UNITS, DEFAULT_TARGETS)
+
+
+# registry used by unitfy if no other one is given
+DEFAULT_UNIT_REGISTRY = default_unit_registry()
+
+
+def get_unit_tree(unit_expr_str):
+    def parse_unit_str(expr, ofs):
+        startofs = ofs
+        # the minus sign is included because it appears
+        # in unit names such as PER-CENT and digits in
+        # unit names such as CM3 and numbers as in 1/KEV
+        while ofs < len(expr) and (expr[ofs].isalnum() or expr[ofs] == "-"):
+            ofs += 1
+        node = {}
+        node["type"] = "unit"
+        node["unit"] = expr[startofs:ofs]
+        return node, ofs
+
+    return parse_arithm_expr(unit_expr_str, parse_unit_str)[0]
+
+
+def is_number_str(unitstr):
+    return unitstr.replace(".", "", 1).isdigit()
+
+
+def substitute_unit_str(unit_tree, registry):
+    def subfun(expr_tree):
+        if expr_tree["type"] == "unit":
+            return registry.convert_unit(expr_tree["unit"])[1]
+        else:
+            raise TypeError("Not a node with a unit")
+
+    return reconstruct_expr_str(unit_tree, subfun)
+
+
+def compute_conversion_factor(unit_tree, registry):
+    def eval_factor(expr_tree):
+        if expr_tree["type"] == "unit":
+            return registry.convert_unit(expr_tree["unit"])[0]
+        else:
+            raise TypeError("Not a node with a unit")
+
+    return eval_expr_tree(unit_tree, eval_factor)
+
+
+def reduce_dimension(unit_tree, registry):
+    ntyp = unit_tree["type"]
+    if ntyp == "unit":
+        unitstr = unit_tree["unit"]
+        if is_number_str(unitstr):
+            return {}
+        dimension = registry.units.get(unitstr, (unitstr,))[0]
+        return {} if dimension == DIMENSIONLESS else {dimension: 1}
+    children = [reduce_dimension(c, registry) for c in unit_tree["children"]]
+    if ntyp in ("neg", "bracket"):
+        return children[0]
+    if ntyp in ("add", "sub"):
+        if children[0] != children[1]:
+            raise ValueError("terms of a sum must have the same dimension")
+        return children[0]
+    if ntyp not in ("prod", "div"):
+        raise TypeError(f"unknown node type {ntyp}")
+    sign = 1 if ntyp == "prod" else -1
+    result = children[0].copy()
+    for dimension, exponent in children[1].items():
+        result[dimension] = result.get(dimension, 0) + sign * exponent
+        if result[dimension] == 0:
+            del result[dimension]
+    return result
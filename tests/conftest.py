@@ -1,4 +1,5 @@
 from pathlib import Path
+import pytest
 
 
 def pytest_addoption(parser):
@@ -15,3 +16,13 @@ def pytest_generate_tests(metafunc):
         else:
             entry_files = exfor_dir.glob("*.txt")
         metafunc.parametrize("entry_file", entry_files)
+
+
+@pytest.fixture
+def library_file(tmp_path):
+    """File with all test entries concatenated."""
+    exfor_dir = Path(__file__).parent / "testdata"
+    library_file = tmp_path / "library.txt"
+    entry_files = sorted(exfor_dir.glob("*.txt"))
+    library_file.write_text("\n".join(f.read_text() for f in entry_files))
+    return library_file
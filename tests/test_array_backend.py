@@ -0,0 +1,61 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from exfor_parserpy import read_exfor, to_exfor
+from exfor_parserpy.utils.comparison_utils import compare_dictionaries
+from exfor_parserpy.utils.custom_iterators import exfor_iterator2
+from exfor_parserpy.trafos import unitfy, uncommonfy, depointerfy, tablify
+
+
+ARRAY_OPTS = {"array_backend": "numpy"}
+
+
+def trafo(exfor_dic):
+    return unitfy(depointerfy(uncommonfy(exfor_dic)))
+
+
+def test_array_backend_stores_data_columns_as_arrays(entry_file):
+    content = read_exfor(entry_file, parse_opts=ARRAY_OPTS)
+    for key, curdic in exfor_iterator2(content):
+        if key == "DATA" and "UNIT" in curdic:
+            for col in curdic["DATA"].values():
+                cols = col.values() if isinstance(col, dict) else [col]
+                for c in cols:
+                    assert isinstance(c, np.ndarray) and c.dtype == np.float64
+
+
+def test_array_backend_gives_same_content_as_list_backend(entry_file):
+    content = read_exfor(entry_file)
+    array_content = read_exfor(entry_file, parse_opts=ARRAY_OPTS)
+    assert compare_dictionaries(content, array_content, atol=0, rtol=0)
+    assert to_exfor(content) == to_exfor(array_content)
+
+
+def test_array_backend_works_with_transformers(entry_file):
+    content = read_exfor(entry_file)
+    array_content = read_exfor(entry_file, parse_opts=ARRAY_OPTS)
+    assert compare_dictionaries(trafo(content), trafo(array_content))
+    if len(content[tuple(content)[0]]) > 1:
+        df1 = tablify(trafo(content))
+        df2 = tablify(trafo(array_content))
+        pd.testing.assert_frame_equal(df1, df2, check_dtype=False)
+
+
+def test_unitfy_leaves_original_arrays_unchanged(entry_file):
+    array_content = read_exfor(entry_file, parse_opts=ARRAY_OPTS)
+    original = read_exfor(entry_file, parse_opts=ARRAY_OPTS)
+    unitfy(array_content)
+    unitfy(array_content, share_unmodified=True)
+    assert compare_dictionaries(array_content, original, atol=0, rtol=0)
+
+
+def test_unitfy_scales_shared_arrays_once():
+    testdata = Path(__file__).parent / "testdata"
+    content = read_exfor(testdata / "entry_21308.txt", parse_opts=ARRAY_OPTS)
+    datadic = content["21308"]["21308002"]["DATA"]
+    expected = datadic["DATA"]["EN-RES"] * 1e-6
+    datadic["DATA"]["EN-RES-ERR"] = datadic["DATA"]["EN-RES"]
+    datadic["UNIT"]["EN-RES-ERR"] = datadic["UNIT"]["EN-RES"]
+    unitfy(content, inplace=True)
+    np.testing.assert_allclose(datadic["DATA"]["EN-RES"], expected)
+    np.testing.assert_allclose(datadic["DATA"]["EN-RES-ERR"], expected)
@@ -0,0 +1,54 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+import tarfile
+import zipfile
+import pytest
+from exfor_parserpy import read_exfor, iter_exfor, ExforFile
+from exfor_parserpy.utils.comparison_utils import compare_dictionaries
+from exfor_parserpy.utils.compression import detect_compression
+
+
+@pytest.mark.parametrize(
+    "compression,opener",
+    [("gzip", gzip.open), ("bz2", bz2.open), ("xz", lzma.open)],
+)
+def test_read_exfor_decompresses_on_the_fly(
+    library_file, tmp_path, compression, opener
+):
+    compressed_file = tmp_path / "library.x4.compressed"
+    with opener(compressed_file, "wb") as f:
+        f.write(library_file.read_bytes())
+    assert detect_compression(compressed_file) == compression
+    content = read_exfor(library_file)
+    assert compare_dictionaries(read_exfor(compressed_file), content)
+    assert compare_dictionaries(dict(iter_exfor(compressed_file)), content)
+    selected = read_exfor(compressed_file, entries=["O2098"])
+    assert compare_dictionaries(selected["O2098"], content["O2098"])
+    with pytest.raises(KeyError):
+        read_exfor(compressed_file, entries=["99999"])
+    with pytest.raises(ValueError):
+        ExforFile(compressed_file)
+
+
+def test_read_exfor_reads_all_members_of_archives(tmp_path):
+    exfor_dir = Path(__file__).parent / "testdata"
+    entry_files = sorted(exfor_dir.glob("*.txt"))
+    content = {}
+    for entry_file in entry_files:
+        content.update(read_exfor(entry_file))
+    zip_file = tmp_path / "library.zip"
+    with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as zf:
+        for entry_file in entry_files:
+            zf.write(entry_file, entry_file.name)
+    tar_file = tmp_path / "library.tar.gz"
+    with tarfile.open(tar_file, "w:gz") as tf:
+        for entry_file in entry_files:
+            tf.add(entry_file, entry_file.name)
+    assert detect_compression(zip_file) == "zip"
+    assert detect_compression(tar_file) == "tar"
+    for archive in (zip_file, tar_file):
+        assert list(read_exfor(archive)) == list(content)
+        assert compare_dictionaries(read_exfor(archive), content)
+        assert compare_dictionaries(dict(iter_exfor(archive)), content)
@@ -0,0 +1,156 @@
+from copy import deepcopy
+from pathlib import Path
+import numpy as np
+import pytest
+from exfor_parserpy import read_exfor, exfor_diff, write_exfor_diff
+from exfor_parserpy.exfor_diff import (
+    compute_edit_matrix,
+    bib_element_diff,
+    collapse_unchanged_lines,
+)
+from exfor_parserpy.utils.alignment import (
+    compute_row_edit_path,
+    compute_char_edit_path,
+    compute_text_edit_types,
+)
+
+
+def path_cost(path, rows1, rows2):
+    cost = 0.0
+    i = j = 0
+    for step in path:
+        if step in ("k", "s"):
+            same = (rows1[i] == rows2[j]) | (np.isnan(rows1[i]) & np.isnan(rows2[j]))
+            assert (step == "k") == same.all()
+            cost += 2 * np.sum(~same) / rows1.shape[1]
+            i += 1
+            j += 1
+        elif step == "d":
+            cost += 1
+            i += 1
+        else:
+            cost += 1
+            j += 1
+    assert i == len(rows1) and j == len(rows2)
+    return cost
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_row_edit_path_is_optimal_for_small_tables(seed):
+    rng = np.random.default_rng(seed)
+    rows1 = rng.integers(0, 3, size=(rng.integers(0, 15), 3)).astype(float)
+    rows2 = rng.integers(0, 3, size=(rng.integers(0, 15), 3)).astype(float)
+    rows1[rows1 == 2] = np.nan
+
+    def cmpfun(x, y):
+        same = (x == y) | (np.isnan(x) & np.isnan(y))
+        return 2 * np.sum(~same) / len(x)
+
+    path = compute_row_edit_path(rows1, rows2)
+    best_cost = compute_edit_matrix(rows1, rows2, cmpfun)[-1, -1]
+    assert path_cost(path, rows1, rows2) == pytest.approx(best_cost)
+
+
+@pytest.mark.parametrize("max_gap_cells", (1, 100, 10**6))
+def test_row_edit_path_finds_changes_in_long_tables(max_gap_cells):
+    rng = np.random.default_rng(1)
+    rows1 = rng.random((2000, 4))
+    rows2 = rows1.copy()
+    rows2[::50, 2] *= 1.5
+    rows2 = np.delete(rows2, range(300, 310), axis=0)
+    rows2 = np.insert(rows2, 1000, rng.random((5, 4)), axis=0)
+    path = compute_row_edit_path(rows1, rows2, max_gap_cells=max_gap_cells)
+    counts = {step: np.sum(path == step) for step in "ksdi"}
+    assert counts == {"k": 1951, "s": 39, "d": 10, "i": 5}
+    path_cost(path, rows1, rows2)
+
+
+def test_row_edit_path_tolerates_rounding_noise():
+    rows1 = np.array([[1.0, 2.0], [3.0, np.nan]])
+    rows2 = rows1 * (1 + 1e-15)
+    path = compute_row_edit_path(rows1, rows2)
+    assert list(path) == ["k", "k"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_char_edit_path_keeps_longest_common_subsequence(seed):
+    rng = np.random.default_rng(seed)
+    text1 = "".join(rng.choice(list("abc "), size=rng.integers(0, 30)))
+    text2 = "".join(rng.choice(list("abc "), size=rng.integers(0, 30)))
+    path = compute_char_edit_path(text1, text2)
+    kept1 = "".join(c for c, t in zip(text1, path[path != "i"]) if t == "k")
+    kept2 = "".join(c for c, t in zip(text2, path[path != "d"]) if t == "k")
+    assert kept1 == kept2
+    numedits = compute_edit_matrix(text1, text2)[-1, -1]
+    assert np.sum(path != "k") == numedits
+
+
+def test_text_edit_types_only_refine_changed_lines():
+    lines1 = ["FIRST LINE", "SECOND LINE", "THIRD LINE"]
+    lines2 = ["FIRST LINE", "SECOND LINES", "THIRD LINE"]
+    types1, types2 = compute_text_edit_types(lines1, lines2)
+    assert "".join(types1) == "k" * 31
+    assert "".join(types2) == "k" * 21 + "i" + "k" * 10
+    types1, types2 = compute_text_edit_types(lines1, lines2, max_gap_cells=1)
+    assert "".join(types1) == "k" * 10 + "d" * 11 + "k" * 10
+    assert "".join(types2) == "k" * 10 + "i" * 12 + "k" * 10
+
+
+def test_bib_element_diff_marks_changed_words():
+    text1 = "\n".join(f"LINE {i} OF A LONG COMMENT" for i in range(2000))
+    text2 = text1.replace("LINE 1000 OF", "LINE 1000 IN")
+    lines = bib_element_diff({"COMMENT": text1}, {"COMMENT": text2})
+    marked = [line for line in lines if "<mark" in line]
+    assert len(marked) == 1
+    assert '<mark class="deletion">OF</mark>' in marked[0]
+    assert '<mark class="addition">IN</mark>' in marked[0]
+
+
+def test_exfor_diff_marks_deleted_rows():
+    testdata = Path(__file__).parent / "testdata"
+    exfor_dic = read_exfor(testdata / "entry_21308.txt")
+    modified = deepcopy(exfor_dic)
+    for entry in modified.values():
+        for subent in entry.values():
+            if "DATA" in subent:
+                for column in subent["DATA"]["DATA"].values():
+                    columns = column.values() if isinstance(column, dict) else [column]
+                    for curcolumn in columns:
+                        del curcolumn[1]
+    lines = exfor_diff(exfor_dic, modified)
+    assert any('<mark class="noline">' in line for line in lines)
+    assert not any('<mark class="addition">' in line for line in lines)
+
+
+def test_collapse_unchanged_lines_keeps_context():
+    lines = [f"line {i}" for i in range(20)]
+    lines[10] = '<mark class="addition">line 10</mark>'
+    collapsed = collapse_unchanged_lines(lines, context=2)
+    assert collapsed[0] == "<details><summary>8 unchanged lines</summary>"
+    assert collapsed[9] == "</details>"
+    assert collapsed[10:15] == [line + "<br>" for line in lines[8:13]]
+    assert collapsed[15] == "<details><summary>7 unchanged lines</summary>"
+    assert collapse_unchanged_lines(lines[8:13], context=2) == collapsed[10:15]
+
+
+def test_write_exfor_diff_collapses_unchanged_entries(tmp_path):
+    testdata = Path(__file__).parent / "testdata"
+    exfor_dic1 = read_exfor(testdata / "entry_21308.txt")
+    entryid = next(iter(exfor_dic1))
+    exfor_dic1["99999"] = deepcopy(exfor_dic1[entryid])
+    exfor_dic2 = deepcopy(exfor_dic1)
+    for subent in exfor_dic2["99999"].values():
+        if "DATA" in subent:
+            column = next(iter(subent["DATA"]["DATA"].values()))
+            column[0] *= 2
+    lines = exfor_diff(exfor_dic1, exfor_dic1)
+    assert lines == exfor_diff(exfor_dic1, exfor_dic1, context=None)
+    filename = tmp_path / "diff.html"
+    write_exfor_diff(filename, exfor_dic1, exfor_dic2)
+    content = filename.read_text()
+    assert f"ENTRY {entryid} unchanged<br>" in content
+    assert "unchanged lines</summary>" in content
+    assert content.endswith("</body></html>")
+    assert len(content) < len("\n".join(exfor_diff(exfor_dic1, exfor_dic2)))
+    write_exfor_diff(filename, exfor_dic1, exfor_dic2, overwrite=True, context=None)
+    assert filename.read_text() == "\n".join(exfor_diff(exfor_dic1, exfor_dic2))
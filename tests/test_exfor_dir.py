@@ -0,0 +1,47 @@
+from pathlib import Path
+import shutil
+import pytest
+from exfor_parserpy import read_exfor, read_exfor_dir, iter_exfor_dir
+from exfor_parserpy.utils.comparison_utils import compare_dictionaries
+
+
+@pytest.fixture
+def exfor_dir(tmp_path):
+    exfor_dir = tmp_path / "exfor"
+    shutil.copytree(Path(__file__).parent / "testdata", exfor_dir)
+    return exfor_dir
+
+
+def read_files_one_by_one(exfor_dir):
+    content = {}
+    for entry_file in sorted(exfor_dir.glob("*.txt")):
+        content.update(read_exfor(entry_file))
+    return content
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_read_exfor_dir_matches_reading_files_one_by_one(exfor_dir, workers):
+    content = read_files_one_by_one(exfor_dir)
+    dir_content = read_exfor_dir(exfor_dir, workers=workers)
+    assert list(dir_content) == list(content)
+    assert compare_dictionaries(dir_content, content)
+
+
+def test_read_exfor_dir_collects_errors_and_reports_progress(exfor_dir):
+    content = read_files_one_by_one(exfor_dir)
+    broken_lines = ["ENTRY".ljust(11) + "12345", "SUBENT".ljust(11) + "12345001"]
+    broken_lines.append("DATA".ljust(11) + "x".rjust(11))
+    (exfor_dir / "broken.txt").write_text("\n".join(broken_lines))
+    errors = []
+    reports = []
+    dir_content = read_exfor_dir(
+        exfor_dir, errors=errors, progress=lambda stats: reports.append(dict(stats))
+    )
+    assert compare_dictionaries(dir_content, content)
+    assert [filename.name for filename, _ in errors] == ["broken.txt"]
+    assert len(reports) == len(content) + 1
+    assert reports[-1]["files_done"] == reports[-1]["files_total"]
+    assert reports[-1]["entries"] == len(content)
+    assert reports[-1]["errors"] == 1
+    with pytest.warns(UserWarning):
+        dict(iter_exfor_dir(exfor_dir))
@@ -0,0 +1,64 @@
+from pathlib import Path
+import shutil
+import pytest
+from exfor_parserpy import read_exfor, ExforFile
+from exfor_parserpy.utils.comparison_utils import compare_dictionaries
+from exfor_parserpy.utils.file_index import get_index_filename, load_index
+
+
+def test_read_exfor_with_selected_entries_matches_full_parse(library_file):
+    content = read_exfor(library_file)
+    selected = read_exfor(library_file, entries=["O2098", "21308"])
+    assert list(selected) == ["O2098", "21308"]
+    for entryid in selected:
+        assert compare_dictionaries(content[entryid], selected[entryid])
+
+
+def test_read_exfor_with_unknown_entry_raises_key_error(library_file):
+    with pytest.raises(KeyError):
+        read_exfor(library_file, entries=["99999"])
+
+
+def test_exforfile_gives_access_to_entries_and_subentries(library_file):
+    content = read_exfor(library_file)
+    with ExforFile(library_file) as exfor_file:
+        assert list(exfor_file) == list(content)
+        assert exfor_file.get("99999") is None
+        for entryid, entry in content.items():
+            assert compare_dictionaries(exfor_file[entryid], entry)
+            for subentid, subent in entry.items():
+                assert compare_dictionaries(exfor_file.get_subentry(subentid), subent)
+
+
+def test_index_is_persisted_and_rebuilt_if_file_changes(library_file):
+    index = load_index(library_file)
+    assert Path(get_index_filename(library_file)).exists()
+    assert load_index(library_file) == index
+    shutil.copy(Path(__file__).parent / "testdata" / "entry_21308.txt", library_file)
+    assert list(load_index(library_file)["entries"]) == ["21308"]
+
+
+def test_exforfile_reads_only_requested_sections(library_file):
+    content = read_exfor(library_file)
+    with ExforFile(library_file) as exfor_file:
+        for entry in content.values():
+            for subentid, subent in entry.items():
+                bibonly = exfor_file.get_subentry(subentid, sections=("BIB",))
+                assert "COMMON" not in bibonly and "DATA" not in bibonly
+                assert ("BIB" in bibonly) == ("BIB" in subent)
+                if "BIB" in subent:
+                    assert compare_dictionaries(bibonly["BIB"], subent["BIB"])
+                dataonly = exfor_file.get_subentry(subentid, sections=("DATA",))
+                assert "BIB" not in dataonly
+                assert ("DATA" in dataonly) == ("DATA" in subent)
+                if "DATA" in subent:
+                    assert compare_dictionaries(dataonly["DATA"], subent["DATA"])
+
+
+def test_index_handles_crlf_line_endings(library_file, tmp_path):
+    crlf_file = tmp_path / "library_crlf.txt"
+    crlf_file.write_bytes(Path(library_file).read_bytes().replace(b"\n", b"\r\n"))
+    assert compare_dictionaries(
+        read_exfor(crlf_file, entries=["21308"]),
+        read_exfor(library_file, entries=["21308"]),
+    )
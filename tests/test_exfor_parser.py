@@ -1,6 +1,20 @@
+import gzip
 from pathlib import Path
+import numpy as np
 import pytest
-from exfor_parserpy import from_exfor, to_exfor, read_exfor, write_exfor
+from exfor_parserpy import (
+    from_exfor,
+    to_exfor,
+    read_exfor,
+    iter_exfor,
+    write_exfor,
+    ExforWriter,
+)
+from exfor_parserpy.exfor_primitives import (
+    write_fields,
+    write_float_field,
+    write_str_field,
+)
 from exfor_parserpy.utils.comparison_utils import compare_dictionaries
 
 
@@ -17,3 +31,115 @@ def test_exforbaseparser_file_writing_and_reading_leaves_content_unchanged(
     written_file = tmp_path / "file.txt"
     write_exfor(written_file, content)
     assert compare_dictionaries(content, read_exfor(written_file), rtol=1e-4)
+
+
+def test_iter_exfor_yields_same_entries_as_read_exfor(entry_file):
+    content = read_exfor(entry_file)
+    streamed = dict(iter_exfor(entry_file))
+    assert compare_dictionaries(content, streamed)
+
+
+def test_iter_exfor_handles_multiple_entries_in_one_file(library_file):
+    streamed = dict(iter_exfor(library_file))
+    assert list(streamed) == list(read_exfor(library_file))
+    assert compare_dictionaries(streamed, read_exfor(library_file))
+
+
+def test_read_exfor_with_workers_matches_serial_parse(library_file):
+    content = read_exfor(library_file)
+    parallel_content = read_exfor(library_file, workers=2)
+    assert list(parallel_content) == list(content)
+    assert compare_dictionaries(parallel_content, content)
+
+
+def test_read_exfor_with_cache_returns_cached_content(library_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    content = read_exfor(library_file, cache_dir=cache_dir)
+    assert len(list(cache_dir.iterdir())) == 2
+    assert compare_dictionaries(read_exfor(library_file, cache_dir=cache_dir), content)
+    # a changed file must not be served from the cache
+    library_file.write_text(
+        (Path(__file__).parent / "testdata" / "entry_21308.txt").read_text()
+    )
+    assert list(read_exfor(library_file, cache_dir=cache_dir)) == ["21308"]
+
+
+def test_cache_depends_on_parse_opts(library_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    read_exfor(library_file, cache_dir=cache_dir)
+    opts = {"array_backend": "numpy"}
+    content = read_exfor(library_file, parse_opts=opts, cache_dir=cache_dir)
+    assert isinstance(
+        content["21308"]["21308002"]["DATA"]["DATA"]["EN-RES"], np.ndarray
+    )
+
+
+def test_write_exfor_streams_same_content_as_to_exfor(library_file, tmp_path):
+    content = read_exfor(library_file)
+    outfile = tmp_path / "output.txt"
+    write_exfor(outfile, content)
+    assert outfile.read_text() == "\n".join(to_exfor(content))
+
+
+def test_write_fields_formats_rows_like_single_field_writer():
+    values = [1.5, None, float("nan"), -2.25e-12, 3, 12345678.0, 0.1]
+    expected = ""
+    for i, val in enumerate(values[:6]):
+        expected = write_float_field(expected, i, val)
+    lines = write_fields(values, 0, dtype="float")
+    assert lines[0] == expected
+    assert lines[1] == write_float_field("", 0, values[6])
+    assert write_fields(["A" * 14, "B"], 0) == [
+        write_str_field(write_str_field("", 0, "A" * 14), 1, "B")
+    ]
+
+
+@pytest.mark.parametrize("position", (0, -1))
+def test_to_exfor_rejects_columns_of_unequal_length(position):
+    testdata = Path(__file__).parent / "testdata"
+    content = read_exfor(testdata / "entry_21308.txt")
+    data = content["21308"]["21308002"]["DATA"]["DATA"]
+    field = list(data)[position]
+    column = data[field]
+    column = column if isinstance(column, list) else list(column.values())[0]
+    column.pop()
+    with pytest.raises(ValueError, match=f"the column {field}.* has 5 values"):
+        to_exfor(content)
+
+
+def test_write_exfor_leaves_no_file_behind_on_error(library_file, tmp_path):
+    content = read_exfor(library_file)
+    outdir = tmp_path / "output"
+    outdir.mkdir()
+    outfile = outdir / "output.txt"
+    outfile.write_text("previous content")
+    broken = {"99999": {"99999001": {}}}
+    with pytest.raises(IndexError):
+        write_exfor(outfile, {**content, **broken}, overwrite=True)
+    assert outfile.read_text() == "previous content"
+    outfile.unlink()
+    with pytest.raises(IndexError):
+        write_exfor(outfile, {**content, **broken})
+    assert list(outdir.iterdir()) == []
+    write_exfor(outfile, content)
+    assert outfile.read_text() == "\n".join(to_exfor(content))
+    assert list(outdir.iterdir()) == [outfile]
+
+
+def test_exfor_writer_writes_entries_from_iter_exfor(library_file, tmp_path):
+    content = read_exfor(library_file)
+    outfile = tmp_path / "output.txt"
+    with ExforWriter(outfile) as writer:
+        for entryid, entry in iter_exfor(library_file):
+            writer.write_entry(entry)
+    assert outfile.read_text() == "\n".join(to_exfor(content))
+    with pytest.raises(FileExistsError):
+        ExforWriter(outfile)
+
+
+def test_exfor_writer_compresses_output_with_gzip(library_file, tmp_path):
+    content = read_exfor(library_file)
+    outfile = tmp_path / "output.txt.gz"
+    write_exfor(outfile, content, compress="gzip")
+    with gzip.open(outfile, "rt") as f:
+        assert f.read() == "\n".join(to_exfor(content))
@@ -0,0 +1,130 @@
+from copy import deepcopy
+from pathlib import Path
+import numpy as np
+import pytest
+from exfor_parserpy import (
+    read_exfor,
+    exfor_patch,
+    apply_exfor_patch,
+    write_exfor_patch,
+    read_exfor_patch,
+)
+from exfor_parserpy.utils.synthetic import generate_exfor
+
+testdata = Path(__file__).parent / "testdata"
+
+
+def modify_library(exfor_dic):
+    exfor_dic = deepcopy(exfor_dic)
+    entryids = sorted(exfor_dic)
+    del exfor_dic[entryids[0]]
+    entry = exfor_dic[entryids[1]]
+    subentids = sorted(entry)
+    del entry[subentids[-1]]
+    entry[subentids[0]]["BIB"]["TITLE"] = "-A NEW TITLE-."
+    subent = entry[subentids[1]]
+    subent["COMMON"]["DATA"]["ANG"] *= 2
+    data = subent["DATA"]["DATA"]
+    units = subent["DATA"]["UNIT"]
+    field = sorted(data)[0]
+    data[field][3] = 42.0
+    for column in data.values():
+        del column[1]
+        column.insert(4, 7.0)
+    units[field] = "KEV"
+    data["EXTRA"] = [1.0] * len(data[field])
+    units["EXTRA"] = "NO-DIM"
+    return exfor_dic
+
+
+def test_exfor_patch_reports_changed_data_points():
+    exfor_dic1 = generate_exfor(4, num_subents=3, num_rows=8)
+    exfor_dic2 = modify_library(exfor_dic1)
+    patch = exfor_patch(exfor_dic1, exfor_dic2)
+    ops = [(r["op"], r["section"], r["block"], r["field"], r["row"]) for r in patch]
+    entryid = sorted(exfor_dic1)[1]
+    subentid = sorted(exfor_dic1[entryid])[1]
+    field = sorted(exfor_dic1[entryid][subentid]["DATA"]["DATA"])[0]
+    assert ops[0] == ("remove", None, None, None, None)
+    assert ("replace", "BIB", None, "TITLE", None) in ops
+    assert ("replace", "COMMON", "DATA", "ANG", None) in ops
+    assert ("replace", "DATA", "UNIT", field, None) in ops
+    assert ("remove", "DATA", "DATA", None, 1) in ops
+    assert ("add", "DATA", "DATA", None, 4) in ops
+    # the row indices refer to the new table
+    assert ("replace", "DATA", "DATA", field, 2) in ops
+    assert ops.count(("add", "DATA", "DATA", "EXTRA", None)) == 1
+    rows = [r for r in patch if r["section"] == "DATA" and r["row"] is not None]
+    assert len(rows) == 3
+    assert exfor_patch(exfor_dic1, exfor_dic1) == []
+
+
+def test_apply_exfor_patch_restores_second_version():
+    exfor_dic1 = generate_exfor(4, num_subents=3, num_rows=8)
+    exfor_dic2 = modify_library(exfor_dic1)
+    original = deepcopy(exfor_dic1)
+    patched = apply_exfor_patch(exfor_dic1, exfor_patch(exfor_dic1, exfor_dic2))
+    assert patched == exfor_dic2
+    assert exfor_dic1 == original
+    reverted = apply_exfor_patch(patched, exfor_patch(exfor_dic2, exfor_dic1))
+    assert reverted == exfor_dic1
+
+
+@pytest.mark.parametrize("filename", ("entry_21308.txt", "entry_T0408.txt"))
+def test_apply_exfor_patch_handles_pointers(filename):
+    exfor_dic1 = read_exfor(testdata / filename)
+    exfor_dic2 = deepcopy(exfor_dic1)
+    for entry in exfor_dic2.values():
+        for subent in entry.values():
+            if "DATA" not in subent:
+                continue
+            for field, column in subent["DATA"]["DATA"].items():
+                columns = column.values() if isinstance(column, dict) else [column]
+                for curcolumn in columns:
+                    del curcolumn[0]
+                    curcolumn.append(None)
+            if "COMMON" in subent:
+                del subent["COMMON"]
+    patch = exfor_patch(exfor_dic1, exfor_dic2)
+    assert apply_exfor_patch(exfor_dic1, patch) == exfor_dic2
+
+
+def test_exfor_patch_can_be_stored(tmp_path):
+    exfor_dic1 = read_exfor(testdata / "entry_21308.txt")
+    exfor_dic2 = deepcopy(exfor_dic1)
+    for entry in exfor_dic2.values():
+        for subent in entry.values():
+            subent["BIB"].setdefault("REACTION", {})["3"] = "(79-AU-197(N,TOT),,WID)"
+    filename = tmp_path / "patch.jsonl"
+    write_exfor_patch(filename, exfor_dic1, exfor_dic2)
+    with pytest.raises(FileExistsError):
+        write_exfor_patch(filename, exfor_dic1, exfor_dic2)
+    patch = list(read_exfor_patch(filename))
+    assert patch == exfor_patch(exfor_dic1, exfor_dic2)
+    assert patch[-1]["pointer"] == "3"
+    assert apply_exfor_patch(exfor_dic1, patch) == exfor_dic2
+
+
+def test_exfor_patch_supports_array_backend(tmp_path):
+    opts = {"array_backend": "numpy"}
+    exfor_dic1 = read_exfor(testdata / "entry_21308.txt", parse_opts=opts)
+    same_dic = read_exfor(testdata / "entry_21308.txt", parse_opts=opts)
+    assert exfor_patch(exfor_dic1, same_dic) == []
+    exfor_dic2 = deepcopy(exfor_dic1)
+    datadic = exfor_dic2["21308"]["21308002"]["DATA"]["DATA"]
+    for field, column in datadic.items():
+        if isinstance(column, dict):
+            for pointer, curcolumn in column.items():
+                column[pointer] = np.insert(np.delete(curcolumn, 0), 2, np.nan)
+        else:
+            datadic[field] = np.insert(np.delete(column, 0), 2, 5.0)
+    filename = tmp_path / "patch.jsonl"
+    write_exfor_patch(filename, exfor_dic1, exfor_dic2)
+    patch = list(read_exfor_patch(filename))
+    assert [(r["op"], r["row"]) for r in patch] == [("remove", 0), ("add", 2)]
+    assert patch[1]["new"]["DATA"]["1"] is None
+    patched = apply_exfor_patch(exfor_dic1, patch)
+    assert isinstance(
+        patched["21308"]["21308002"]["DATA"]["DATA"]["EN-RES"], np.ndarray
+    )
+    assert exfor_patch(patched, exfor_dic2) == []
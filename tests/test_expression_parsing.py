@@ -40,6 +40,8 @@ def eval_number_node(expr_tree):
         ("-32 - 64", -96),
         ("  32 * 16 / (32*-16)", -1),
         ("  32 * 16 / 32*-16", -256),
+        ("64 / 4 / 2", 8),
+        ("-64/4/-2", 8),
     ),
 )
 def test_arithmetic_expression_parsing_works_correctly(arithm_expr_str, expect_res):
@@ -60,6 +62,7 @@ def test_arithmetic_expression_parsing_works_correctly(arithm_expr_str, expect_r
         "-32 - 64",
         "  32 * 16 / (32*-16)",
         "  32 * 16 / 32*-16",
+        "64 / 4 / 2",
     ),
 )
 def test_arithmetic_expression_reconstruction_works_correctly(arithm_expr_str):
@@ -0,0 +1,57 @@
+import math
+import pytest
+from exfor_parserpy.utils.fortran_utils import fortstr2float, read_fort_float_table
+from exfor_parserpy.exfor_primitives import read_fields, read_float_columns
+
+
+FIELDS = (
+    " 1.8871E+03",
+    " 1.2345-4  ",
+    "-1.2345+12 ",
+    "    .5-3   ",
+    "1.-3       ",
+    "  -7       ",
+    "+3.25      ",
+    " 1.0 E+03  ",
+    "           ",
+    "  0.0      ",
+    " 4.5e-02   ",
+    "1234567.   ",
+)
+
+
+def test_vectorized_float_conversion_matches_fortstr2float():
+    line = "".join(FIELDS)
+    lines = [line[i : i + 66].rstrip() for i in range(0, len(line), 66)]
+    values, blank = read_fort_float_table(lines, 6)
+    for i, field in enumerate(FIELDS):
+        row, col = divmod(i, 6)
+        if field.strip() == "":
+            assert blank[row, col] and math.isnan(values[row, col])
+        else:
+            assert not blank[row, col]
+            assert values[row, col] == fortstr2float(field.rstrip())
+
+
+@pytest.mark.parametrize("numfields", (1, 5, 6, 7, 12))
+def test_read_float_columns_matches_field_by_field_reading(numfields):
+    num_lines_per_row = (numfields + 5) // 6
+    fields = [FIELDS[i % len(FIELDS)] for i in range(numfields * 4)]
+    lines = []
+    for start in range(0, len(fields), numfields):
+        row = fields[start : start + numfields]
+        for i in range(0, numfields, 6):
+            lines.append("".join(row[i : i + 6]).rstrip())
+    columns, ofs = read_float_columns(lines, numfields, 4, 0)
+    assert ofs == 4 * num_lines_per_row
+    ofs = 0
+    for currow in range(4):
+        values, ofs = read_fields(lines, numfields, ofs, dtype="float")
+        assert values == [col[currow] for col in columns]
+
+
+def test_read_float_columns_falls_back_for_unusual_content():
+    lines = ["\t1.5       " + " 2.0", " 3.0       "]
+    columns, ofs = read_float_columns(lines, 2, 2, 0)
+    assert ofs == 2
+    assert columns == [[1.5, 3.0], [2.0, None]]
@@ -0,0 +1,132 @@
+from copy import deepcopy
+from pathlib import Path
+import json
+import numpy as np
+from exfor_parserpy import (
+    ExforFile,
+    read_exfor,
+    write_exfor,
+    library_diff,
+    fingerprint_library,
+)
+from exfor_parserpy.exfor_library_diff import compare_fingerprints
+from exfor_parserpy.utils.fingerprint import fingerprint_subentry
+from exfor_parserpy.utils.synthetic import generate_exfor
+
+
+class CountingDict(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.accessed = []
+
+    def __getitem__(self, key):
+        self.accessed.append(key)
+        return super().__getitem__(key)
+
+
+def make_releases():
+    release1 = generate_exfor(6, num_subents=3, num_rows=5)
+    release2 = deepcopy(release1)
+    del release2["10000"]
+    release2["10006"] = generate_exfor(1, first_entrynum=10006)["10006"]
+    release2["10003"]["10003003"]["DATA"]["DATA"]["EN"][2] *= 2
+    del release2["10004"]["10004004"]
+    return release1, release2
+
+
+def test_library_diff_summarizes_changes():
+    release1, release2 = make_releases()
+    summary = library_diff(release1, release2)
+    assert summary["entries"] == {
+        "added": ["10006"],
+        "removed": ["10000"],
+        "modified": ["10003", "10004"],
+    }
+    assert summary["subentries"]["modified"] == ["10003003"]
+    assert summary["subentries"]["removed"][-1] == "10004004"
+    assert summary["unchanged_entries"] == 3
+
+
+def test_library_diff_writes_pages(tmp_path):
+    release1, release2 = make_releases()
+    summary = library_diff(release1, release2, tmp_path / "serial")
+    parallel = library_diff(release1, release2, tmp_path / "parallel", workers=2)
+    assert summary == parallel
+    assert sorted(summary["pages"]) == ["10000", "10003", "10004", "10006"]
+    for page in summary["pages"].values():
+        assert (tmp_path / "serial" / page).read_text() == (
+            tmp_path / "parallel" / page
+        ).read_text()
+    index = (tmp_path / "serial" / "index.html").read_text()
+    assert '<a href="10003.html">10003</a>' in index
+    stored = json.loads((tmp_path / "serial" / "summary.json").read_text())
+    assert stored == summary
+
+
+def test_library_diff_fingerprints_exfor_files_in_workers(tmp_path):
+    release1, release2 = make_releases()
+    summary = library_diff(release1, release2, tmp_path / "dicts")
+    write_exfor(tmp_path / "release1.txt", release1)
+    write_exfor(tmp_path / "release2.txt", release2)
+    with ExforFile(tmp_path / "release1.txt") as file1:
+        with ExforFile(tmp_path / "release2.txt") as file2:
+            parallel = library_diff(file1, file2, tmp_path / "files", workers=2)
+    assert parallel == summary
+
+
+def test_library_diff_overwrite_removes_stale_pages(tmp_path):
+    release1, release2 = make_releases()
+    library_diff(release1, release2, tmp_path)
+    (tmp_path / "notes.txt").write_text("keep")
+    release2["10003"] = deepcopy(release1["10003"])
+    summary = library_diff(release1, release2, tmp_path, overwrite=True)
+    assert sorted(summary["pages"]) == ["10000", "10004", "10006"]
+    assert not (tmp_path / "10003.html").exists()
+    assert (tmp_path / "notes.txt").read_text() == "keep"
+
+
+def test_library_diff_only_reads_changed_entries(tmp_path):
+    release1, release2 = make_releases()
+    fingerprints1 = json.loads(json.dumps(fingerprint_library(release1)))
+    release1 = CountingDict(release1)
+    library_diff(release1, release2, outdir=tmp_path, fingerprints1=fingerprints1)
+    assert sorted(release1.accessed) == ["10000", "10003", "10004"]
+
+
+def test_fingerprints_do_not_depend_on_reader(tmp_path):
+    release1, _ = make_releases()
+    filename = tmp_path / "release.txt"
+    write_exfor(filename, release1)
+    with ExforFile(filename) as exfor_file:
+        fingerprints = fingerprint_library(exfor_file)
+    assert fingerprints == fingerprint_library(read_exfor(filename))
+
+
+def test_fingerprints_are_computed_from_content():
+    subent = {
+        "__subentid": "10000002",
+        "BIB": {"REACTION": {"1": "(1-H-1(N,EL),,SIG)"}},
+        "DATA": {"UNIT": {"EN": "MEV"}, "DATA": {"EN": [1.5, None]}},
+    }
+    # stored fingerprints must stay valid across Python and NumPy versions
+    assert fingerprint_subentry(subent) == "327220f3e1827cdbbf8b1ed98c9fea4c"
+    modified = deepcopy(subent)
+    modified["DATA"]["DATA"]["EN"][1] = float("nan")
+    assert fingerprint_subentry(modified) != fingerprint_subentry(subent)
+    columns = {"EN": np.array([1.5, 2.0]), "DATA": np.array([1.5, 2.0])}
+    big_endian = {k: v.astype(">f8") for k, v in columns.items()}
+    assert fingerprint_subentry(columns) == fingerprint_subentry(big_endian)
+
+
+def test_fingerprints_support_array_backend():
+    testdata = Path(__file__).parent / "testdata"
+    exfor_dic = read_exfor(
+        testdata / "entry_21308.txt", parse_opts={"array_backend": "numpy"}
+    )
+    modified = deepcopy(exfor_dic)
+    modified["21308"]["21308002"]["DATA"]["DATA"]["EN-RES"][0] += 1
+    fingerprints = fingerprint_library(exfor_dic)
+    assert fingerprints == fingerprint_library(deepcopy(exfor_dic))
+    assert compare_fingerprints(
+        fingerprints["21308"], fingerprint_library(modified)["21308"]
+    )["modified"] == ["21308002"]
@@ -0,0 +1,61 @@
+import pytest
+from exfor_parserpy import read_exfor, iter_exfor
+from exfor_parserpy.utils.comparison_utils import compare_dictionaries
+from exfor_parserpy.trafos import (
+    Pipeline,
+    unitfy,
+    depointerfy,
+    uncommonfy,
+    detextify,
+    reactify,
+)
+
+
+@pytest.mark.parametrize(
+    "trafos",
+    (
+        [uncommonfy, depointerfy, unitfy],
+        [depointerfy, uncommonfy, unitfy],
+        [unitfy, depointerfy, uncommonfy, reactify, detextify],
+        [(depointerfy, {"delete_pointered_subents": False}), unitfy],
+    ),
+)
+def test_pipeline_gives_same_result_as_chained_trafos(entry_file, trafos):
+    content = read_exfor(entry_file)
+    expected = content
+    for trafo in trafos:
+        if isinstance(trafo, tuple):
+            expected = trafo[0](expected, **trafo[1])
+        else:
+            expected = trafo(expected)
+    result = Pipeline(trafos)(content)
+    assert compare_dictionaries(result, expected)
+    assert compare_dictionaries(content, read_exfor(entry_file))
+
+
+def test_pipeline_in_streaming_mode(library_file):
+    pipeline = Pipeline([uncommonfy, depointerfy, unitfy])
+    expected = unitfy(depointerfy(uncommonfy(read_exfor(library_file))))
+    result = dict(pipeline.iterate(iter_exfor(library_file)))
+    assert compare_dictionaries(result, expected)
+
+
+def test_pipeline_with_workers(library_file):
+    pipeline = Pipeline([uncommonfy, depointerfy, unitfy])
+    content = read_exfor(library_file)
+    result = pipeline(content, workers=2)
+    assert list(result) == list(content)
+    assert compare_dictionaries(result, pipeline(content))
+
+
+def test_pipeline_inplace(entry_file):
+    content = read_exfor(entry_file)
+    expected = Pipeline([uncommonfy, depointerfy, unitfy])(content)
+    result = Pipeline([uncommonfy, depointerfy, unitfy], inplace=True)(content)
+    assert compare_dictionaries(result, expected)
+    assert compare_dictionaries(content, expected)
+
+
+def test_pipeline_rejects_unknown_functions():
+    with pytest.raises(TypeError):
+        Pipeline([print])
@@ -0,0 +1,60 @@
+import json
+import pytest
+from exfor_parserpy import read_exfor, iter_exfor
+from exfor_parserpy.trafos import Pipeline, uncommonfy, depointerfy, unitfy, tablify
+from exfor_parserpy.utils.units import DEFAULT_UNIT_REGISTRY
+from exfor_parserpy.utils.profiling import Profiler
+
+
+def test_profiler_records_parse_stages_via_parse_opts(library_file):
+    profiler = Profiler(num_slowest=2)
+    exfor_dic = read_exfor(library_file, parse_opts={"profile": profiler})
+    stats = profiler.to_dict()
+    entry_stats = stats["stages"]["parse_entry"]
+    assert entry_stats["calls"] == len(exfor_dic)
+    assert entry_stats["entries"] == len(exfor_dic)
+    lines = library_file.read_text().splitlines()
+    assert entry_stats["lines"] == len([line for line in lines if line != ""])
+    assert entry_stats["bytes"] > 0
+    for name in ("parse_bib", "parse_common", "parse_data"):
+        assert stats["stages"][name]["calls"] > 0
+    slowest = stats["slowest_entries"]["parse_entry"]
+    assert len(slowest) == 2
+    assert slowest[0]["time"] >= slowest[1]["time"]
+    assert set(x["entry"] for x in slowest) <= set(exfor_dic)
+    assert json.loads(profiler.to_json()) == stats
+
+
+def test_profile_true_creates_profiler_in_parse_opts(library_file):
+    parse_opts = {"profile": True}
+    exfor_dic = read_exfor(library_file, parse_opts=parse_opts)
+    profiler = parse_opts["profile"]
+    assert isinstance(profiler, Profiler)
+    assert profiler.stages["parse_entry"]["calls"] == len(exfor_dic)
+    assert read_exfor(library_file, parse_opts={"profile": False}) == exfor_dic
+    with pytest.raises(TypeError):
+        read_exfor(library_file, parse_opts={"profile": "yes"})
+
+
+def test_profiler_records_trafo_stages_in_with_statement(library_file, tmp_path):
+    # the profiler only sees the unit expressions not yet cached
+    DEFAULT_UNIT_REGISTRY.clear_cache()
+    with Profiler() as profiler:
+        exfor_dic = read_exfor(library_file)
+        unitfy(exfor_dic)
+        pipeline = Pipeline([uncommonfy, depointerfy, unitfy])
+        transformed = dict(pipeline.iterate(iter_exfor(library_file)))
+        tablify(transformed, columnar=True)
+    # stages outside of the with statement are not recorded
+    unitfy(exfor_dic)
+    stages = profiler.to_dict()["stages"]
+    assert stages["unitfy"]["calls"] == 1
+    assert stages["parse_entry"]["calls"] == 2 * len(exfor_dic)
+    assert stages["unitfy.compile_unit"]["calls"] > 0
+    assert stages["copy"]["calls"] == 1
+    assert stages["pipeline.entry"]["calls"] == len(exfor_dic)
+    assert stages["pipeline.depointerfy_stage"]["calls"] > 0
+    assert stages["depointerfy.split"]["calls"] > 0
+    assert stages["tablify.concat"]["calls"] == 1
+    profiler.to_json(tmp_path / "profile.json")
+    assert json.loads((tmp_path / "profile.json").read_text())["stages"] == stages
@@ -0,0 +1,43 @@
+import pytest
+from exfor_parserpy import from_exfor, to_exfor, read_exfor
+from exfor_parserpy.trafos import Pipeline, uncommonfy, depointerfy, unitfy, tablify
+from exfor_parserpy.utils.comparison_utils import compare_dictionaries
+from exfor_parserpy.utils.synthetic import (
+    generate_entry,
+    generate_exfor,
+    write_synthetic_exfor,
+)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"num_cols": 10, "num_rows": 25, "num_common": 8, "bib_lines": 5},
+        {"num_pointers": 2, "num_multifields": 2, "blank_fraction": 0.2},
+        {"num_pointers": 1, "num_multifields": 1, "bib_lines": 0},
+    ],
+)
+def test_synthetic_entries_survive_conversion_to_exfor(options):
+    exfor_dic = generate_exfor(3, **options)
+    assert compare_dictionaries(from_exfor(to_exfor(exfor_dic)), exfor_dic)
+
+
+def test_synthetic_entries_are_deterministic():
+    exfor_dic = generate_exfor(3, num_pointers=2, blank_fraction=0.1)
+    assert to_exfor(generate_exfor(3, num_pointers=2, blank_fraction=0.1)) == to_exfor(
+        exfor_dic
+    )
+    entryid, entry = generate_entry(10001, num_pointers=2, blank_fraction=0.1)
+    assert to_exfor({entryid: entry}) == to_exfor({entryid: exfor_dic[entryid]})
+    assert to_exfor(generate_exfor(3, seed=1)) != to_exfor(generate_exfor(3))
+
+
+def test_written_synthetic_file_can_be_transformed(tmp_path):
+    filename = tmp_path / "synthetic.txt"
+    options = {"num_subents": 3, "num_pointers": 2, "num_multifields": 2}
+    write_synthetic_exfor(filename, 5, **options)
+    exfor_dic = read_exfor(filename)
+    assert compare_dictionaries(exfor_dic, generate_exfor(5, **options))
+    transformed = Pipeline([uncommonfy, depointerfy, unitfy])(exfor_dic)
+    assert len(tablify(transformed, columnar=True)) == 5 * 3 * 2 * 10
@@ -1,6 +1,8 @@
 from pathlib import Path
 import pytest
-from exfor_parserpy import read_exfor
+import numpy as np
+import pandas as pd
+from exfor_parserpy import read_exfor, iter_exfor
 from exfor_parserpy.utils.comparison_utils import compare_dictionaries
 from exfor_parserpy.trafos import (
     unitfy,
@@ -9,7 +11,12 @@ from exfor_parserpy.trafos import (
     detextify,
     tablify,
     reactify,
+    substituty,
 )
+from exfor_parserpy.trafos.tablify import iter_tablify, write_parquet
+from exfor_parserpy.trafos.unitfy import compile_unit
+from exfor_parserpy.utils.profiling import Profiler
+from exfor_parserpy.utils.units import default_unit_registry
 
 
 def test_unitfy_never_fails(entry_file):
@@ -77,3 +84,112 @@ def test_uncommonfy_depointerfy_commutativity(entry_file):
             f"chaining of depointerfy and uncommonfy "
             f"failed on file {entry_file} with exception {exc}"
         )
+
+
+TRAFOS = (unitfy, depointerfy, uncommonfy, detextify, reactify)
+
+
+@pytest.mark.parametrize("trafo", TRAFOS)
+def test_inplace_trafo_modifies_and_returns_input(entry_file, trafo):
+    content = read_exfor(entry_file)
+    expected = trafo(content)
+    result = trafo(content, inplace=True)
+    assert result is content
+    assert compare_dictionaries(result, expected)
+
+
+@pytest.mark.parametrize("trafo", TRAFOS)
+def test_trafo_sharing_unmodified_subentries_leaves_input_unchanged(entry_file, trafo):
+    content = read_exfor(entry_file)
+    expected = trafo(content)
+    result = trafo(content, share_unmodified=True)
+    assert compare_dictionaries(result, expected)
+    assert compare_dictionaries(content, read_exfor(entry_file))
+
+
+def test_share_unmodified_shares_subentries_without_changes(entry_file):
+    content = read_exfor(entry_file)
+    result = reactify(content, share_unmodified=True)
+    for entryid, entry in content.items():
+        for subentid, subent in entry.items():
+            is_shared = result[entryid][subentid] is subent
+            assert is_shared == ("REACTION" not in subent["BIB"])
+
+
+def test_substituty_with_share_unmodified_leaves_input_unchanged(entry_file):
+    content = read_exfor(entry_file)
+    replace_dict = {"(2UK HAR)": "Harwell"}
+    expected = substituty(content, "INSTITUTE", replace_dict)
+    result = substituty(content, "INSTITUTE", replace_dict, share_unmodified=True)
+    assert compare_dictionaries(result, expected)
+    assert compare_dictionaries(content, read_exfor(entry_file))
+
+
+def test_columnar_tablify_agrees_with_tablify(entry_file):
+    content = read_exfor(entry_file)
+    if len(content[tuple(content)[0]]) == 1:
+        pytest.skip("columnar tablify needs an entry with several subentries")
+    df = tablify(content)
+    columnar_df = tablify(content, columnar=True)
+    assert len(df) == len(columnar_df)
+    # tablify repeats columns present in the first and another subentry
+    # whereas they appear only once in columnar mode
+    cols = [c for c in columnar_df.columns if list(df.columns).count(c) == 1]
+    pd.testing.assert_frame_equal(
+        df[cols].infer_objects(), columnar_df[cols], check_dtype=False
+    )
+
+
+def test_tablify_with_workers_and_iter_tablify(library_file):
+    content = read_exfor(library_file)
+    columnar_df = tablify(content, columnar=True)
+    parallel_df = tablify(content, workers=2)
+    pd.testing.assert_frame_equal(columnar_df, parallel_df)
+    frames = [df for _, df in iter_tablify(iter_exfor(library_file))]
+    assert sum(len(df) for df in frames) == len(columnar_df)
+    for df in frames:
+        subdf = columnar_df[columnar_df.ENTRY == df.ENTRY[0]][df.columns]
+        pd.testing.assert_frame_equal(
+            subdf.reset_index(drop=True), df, check_dtype=False
+        )
+
+
+def test_iter_tablify_yields_arrow_record_batches(library_file):
+    pa = pytest.importorskip("pyarrow")
+    content = read_exfor(library_file)
+    for entryid, batch in iter_tablify(content, output="arrow"):
+        assert isinstance(batch, pa.RecordBatch)
+        assert batch.column("ENTRY")[0].as_py() == entryid
+
+
+def test_write_parquet_writes_tablified_entries(library_file, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    content = read_exfor(library_file)
+    outdir = tmp_path / "parquet"
+    filenames = write_parquet(iter_exfor(library_file), outdir, entries_per_file=2)
+    assert len(filenames) == 2
+    schema = pa.unify_schemas([pq.read_schema(f) for f in filenames])
+    table = ds.dataset(outdir, schema=schema).to_table()
+    columnar_df = tablify(content, columnar=True)
+    assert table.num_rows == len(columnar_df)
+    assert set(table.column_names) == set(columnar_df.columns)
+    df = table.to_pandas()
+    assert np.allclose(df["DATA"], columnar_df["DATA"], equal_nan=True)
+    assert list(df["SUBENTRY"]) == list(columnar_df["SUBENTRY"])
+    with pytest.raises(FileExistsError):
+        write_parquet(content, outdir)
+
+
+def test_unitfy_compiles_each_unit_expression_once(entry_file):
+    registry = default_unit_registry()
+    content = read_exfor(entry_file)
+    with Profiler() as profiler:
+        unitfy(content, registry=registry)
+        calls = profiler.stages["unitfy.compile_unit"]["calls"]
+        unitfy(content, registry=registry)
+    assert profiler.stages["unitfy.compile_unit"]["calls"] == calls
+    assert compile_unit("KEV", registry) == (1e-3, "MEV")
+    assert compile_unit("MB/SR", registry) == (1, "MB/SR")
@@ -0,0 +1,87 @@
+import pickle
+import pytest
+from exfor_parserpy import read_exfor
+from exfor_parserpy.trafos import Pipeline, unitfy
+from exfor_parserpy.utils.units import (
+    DEFAULT_TARGETS,
+    DEFAULT_UNITS,
+    UnitRegistry,
+    default_unit_registry,
+)
+
+
+@pytest.mark.parametrize(
+    "unit_expr_str, expect_fact, expect_unit",
+    (
+        ("KEV", 1e-3, "MEV"),
+        ("B/SR/KEV", 1e6, "MB/SR/MEV"),
+        ("MU-B/SR", 1e-3, "MB/SR"),
+        ("1/KEV", 1e3, "1/MEV"),
+        ("B*KEV", 1, "MB*MEV"),
+        ("PER-CENT", 1e-2, "NO-DIM"),
+        ("MSEC", 1e-3, "SEC"),
+        ("CM3/S/MOL", 1, "CM3/S/MOL"),
+    ),
+)
+def test_registry_converts_compound_units(unit_expr_str, expect_fact, expect_unit):
+    fact, newunit = default_unit_registry().compile(unit_expr_str)
+    assert fact == pytest.approx(expect_fact)
+    assert newunit == expect_unit
+
+
+def test_registry_reduces_dimensions():
+    registry = default_unit_registry()
+    assert registry.dimension("B/SR/KEV") == {"B": 1, "SR": -1, "E": -1}
+    assert registry.dimension("KEV*B/KEV") == {"B": 1}
+    assert registry.dimension("PER-CENT") == {}
+    assert registry.dimension("1/K9") == {"K9": -1}
+    with pytest.raises(ValueError):
+        registry.dimension("KEV+B")
+
+
+def test_registry_changes_clear_the_cache():
+    registry = default_unit_registry()
+    assert registry.compile("EV") == (1e-6, "MEV")
+    registry.set_target("E", "KEV")
+    assert registry.compile("EV") == (1e-3, "KEV")
+    registry.set_target("E", None)
+    assert registry.compile("EV") == (1, "EV")
+    with pytest.raises(ValueError):
+        registry.set_target("E", "MB")
+
+
+def test_registry_loads_units_from_file(tmp_path):
+    filename = tmp_path / "units.txt"
+    filename.write_text(
+        "# code dimension factor target\n\nEV E 1\nKEV E 1e3 *\nB B 1 *\n"
+    )
+    registry = UnitRegistry().load(filename)
+    assert registry.compile("EV/B") == (1e-3, "KEV/B")
+    assert registry.compile("MEV") == (1, "MEV")
+
+
+def test_unitfy_and_pipeline_use_given_registry(entry_file):
+    registry = default_unit_registry()
+    registry.set_target("E", "EV")
+    registry = pickle.loads(pickle.dumps(registry))
+    content = read_exfor(entry_file)
+    expected = unitfy(content, registry=registry)
+    pipeline = Pipeline([(unitfy, {"registry": registry})])
+    assert pipeline(content) == expected
+    for entry in expected.values():
+        for subent in entry.values():
+            units = subent.get("DATA", {}).get("UNIT", {}).values()
+            assert "MEV" not in units
+
+
+def test_registry_cache_is_bounded_and_cleared_on_change():
+    registry = UnitRegistry(DEFAULT_UNITS, DEFAULT_TARGETS, cache_size=2)
+    for expr in ("KEV", "B/SR", "EV/SR", "KEV"):
+        registry.compile(expr)
+        registry.dimension(expr)
+    assert len(registry._compiled) == 2
+    assert registry._compiled.get("KEV") == (1e-3, "MEV")
+    assert registry._compiled.get("B/SR") is None
+    registry.set_target("E", "EV")
+    assert len(registry._compiled) == 0 and len(registry._dimensions) == 0
+    assert registry.compile("KEV") == (pytest.approx(1e3), "EV")